@@ -0,0 +1,179 @@
+#YOLO 를 매 프레임 돌리지 않고 N 프레임마다(또는 장면이 크게 바뀌면) 돌리고
+#그 사이 프레임은 박스를 등속 운동으로 예측해서 채우는 모듈
+#검출 결과와 예측 박스는 IoU 로 짝지어서 같은 물체에는 같은 id 를 유지
+#박스 배열 : 검출기 출력 (N, 6) x1, y1, x2, y2, conf, cls
+#추적 결과 : (N, 7) x1, y1, x2, y2, id, conf, cls (conf, cls 가 맨 뒤라 검출 배열과 같은 방식으로 읽힘)
+
+
+import cv2
+import numpy as np
+
+
+#이번 프레임에 검출기를 돌려야 하는지 결정
+#interval : 검출 간격 (프레임), change_threshold : 마지막 검출 프레임과 축소 흑백 이미지의 평균 밝기 차이가 이 값 이상이면 바로 검출
+#thumb_size : 장면 비교용 축소 크기 (w, h)
+class DetectionScheduler:
+    def __init__(self, interval=3, change_threshold=25.0, thumb_size=(32, 18)):
+        self.interval = max(1, interval)
+        self.change_threshold = change_threshold
+        self.thumb_size = thumb_size
+        self.reset()
+
+    def reset(self):
+        self.since_detect = None
+        self.last_thumb = None
+
+    def thumbnail(self, frame):
+        small = cv2.resize(frame, self.thumb_size, interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+
+    #frame : 원본 BGR, 반환 : 검출해야 하면 True
+    def should_detect(self, frame):
+        if self.interval == 1:
+            return True
+        thumb = self.thumbnail(frame)
+        detect = (self.since_detect is None or self.since_detect + 1 >= self.interval or
+                  float(cv2.absdiff(thumb, self.last_thumb).mean()) >= self.change_threshold)
+        if detect:
+            self.since_detect = 0
+            self.last_thumb = thumb
+        else:
+            self.since_detect += 1
+        return detect
+
+
+#박스 두 묶음 사이의 IoU 행렬, a : (N, 4), b : (M, 4) -> (N, M)
+def iou_matrix(a, b):
+    x0 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y0 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x1 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y1 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(x1 - x0, 0, None) * np.clip(y1 - y0, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    return inter / np.maximum(area_a[:, None] + area_b[None, :] - inter, 1e-6)
+
+
+#IoU 짝짓기 + 등속 예측 박스 추적기
+#iou_threshold : 같은 물체로 볼 최소 IoU, max_missed : 검출에서 연속으로 빠져도 안에 유지할 횟수 (빠진 동안은 결과에 없음)
+#smoothing : 속도 갱신 비율 (1 이면 마지막 이동량만 사용)
+class BoxTracker:
+    def __init__(self, iou_threshold=0.3, max_missed=1, smoothing=0.5):
+        self.iou_threshold = iou_threshold
+        self.max_missed = max_missed
+        self.smoothing = smoothing
+        self.reset()
+
+    def reset(self):
+        self.boxes = np.zeros((0, 4), dtype=np.float32)
+        self.velocity = np.zeros((0, 4), dtype=np.float32)
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.conf = np.zeros(0, dtype=np.float32)
+        self.cls = np.zeros(0, dtype=np.float32)
+        self.missed = np.zeros(0, dtype=np.int32)
+        #마지막으로 검출과 짝지어진 뒤 지난 프레임 수 (속도 계산용)
+        self.age = np.zeros(0, dtype=np.int32)
+        self.next_id = 1
+
+    def __len__(self):
+        return len(self.ids)
+
+    #마지막 검출 프레임에서 짝지어진(또는 새로 생긴) 추적만 반환
+    #검출에서 빠진 추적은 다음 검출 때 다시 짝지을 수 있도록 안에만 남겨두고 그리거나 경고하지 않음
+    def result(self):
+        visible = self.missed == 0
+        out = np.empty((int(visible.sum()), 7), dtype=np.float32)
+        out[:, :4] = self.boxes[visible]
+        out[:, 4] = self.ids[visible]
+        out[:, 5] = self.conf[visible]
+        out[:, 6] = self.cls[visible]
+        return out
+
+    #검출 없는 프레임 : 박스를 속도만큼 이동
+    def predict(self):
+        self.boxes += self.velocity
+        self.age += 1
+        return self.result()
+
+    #검출이 있는 프레임 : 예측 박스와 검출 박스를 짝짓고 갱신, detections : (N, 6)
+    def update(self, detections):
+        self.boxes += self.velocity
+        self.age += 1
+        detections = np.asarray(detections, dtype=np.float32)
+        det_boxes = detections[:, :4]
+        det_conf = detections[:, -2]
+        det_cls = detections[:, -1]
+
+        matched_tracks, matched_dets = self.associate(det_boxes, det_cls)
+
+        #짝지어진 추적 : 위치, 속도, 신뢰도 갱신
+        if len(matched_tracks):
+            t, d = matched_tracks, matched_dets
+            step = (det_boxes[d] - (self.boxes[t] - self.velocity[t] * self.age[t, None])) / self.age[t, None]
+            self.velocity[t] = self.smoothing * step + (1 - self.smoothing) * self.velocity[t]
+            self.boxes[t] = det_boxes[d]
+            self.conf[t] = det_conf[d]
+            self.missed[t] = 0
+            self.age[t] = 0
+
+        #짝 없는 추적 : 빠진 횟수 증가, 너무 오래 빠지면 삭제
+        unmatched = np.ones(len(self.ids), dtype=bool)
+        unmatched[matched_tracks] = False
+        self.missed[unmatched] += 1
+        keep = self.missed <= self.max_missed
+        self.select(keep)
+
+        #짝 없는 검출 : 새 id 로 추가
+        new = np.ones(len(detections), dtype=bool)
+        new[matched_dets] = False
+        if new.any():
+            count = int(new.sum())
+            self.boxes = np.vstack([self.boxes, det_boxes[new]])
+            self.velocity = np.vstack([self.velocity, np.zeros((count, 4), dtype=np.float32)])
+            self.ids = np.concatenate([self.ids, np.arange(self.next_id, self.next_id + count)])
+            self.conf = np.concatenate([self.conf, det_conf[new]])
+            self.cls = np.concatenate([self.cls, det_cls[new]])
+            self.missed = np.concatenate([self.missed, np.zeros(count, dtype=np.int32)])
+            self.age = np.concatenate([self.age, np.zeros(count, dtype=np.int32)])
+            self.next_id += count
+            #새 검출과 겹치는 빠진 추적은 같은 물체를 다른 id 로 다시 잡은 것으로 보고 삭제
+            missed = self.missed > 0
+            if missed.any():
+                overlap = iou_matrix(self.boxes[missed], det_boxes[new])
+                overlap[self.cls[missed][:, None] != det_cls[new][None, :]] = 0
+                keep = np.ones(len(self.ids), dtype=bool)
+                keep[np.flatnonzero(missed)[(overlap > 0).any(axis=1)]] = False
+                self.select(keep)
+        return self.result()
+
+    #IoU 가 큰 쌍부터 차례로 짝짓기 (같은 클래스끼리만)
+    #반환 : (추적 인덱스 배열, 검출 인덱스 배열)
+    def associate(self, det_boxes, det_cls):
+        empty = np.zeros(0, dtype=np.int64)
+        if len(self.ids) == 0 or len(det_boxes) == 0:
+            return empty, empty
+        iou = iou_matrix(self.boxes, det_boxes)
+        iou[self.cls[:, None] != det_cls[None, :]] = 0
+        pairs = np.argwhere(iou >= self.iou_threshold)
+        if len(pairs) == 0:
+            return empty, empty
+        pairs = pairs[np.argsort(-iou[pairs[:, 0], pairs[:, 1]])]
+        used_tracks, used_dets = set(), set()
+        tracks, dets = [], []
+        for t, d in pairs:
+            if t in used_tracks or d in used_dets:
+                continue
+            used_tracks.add(t)
+            used_dets.add(d)
+            tracks.append(t)
+            dets.append(d)
+        return np.array(tracks, dtype=np.int64), np.array(dets, dtype=np.int64)
+
+    def select(self, keep):
+        self.boxes = self.boxes[keep]
+        self.velocity = self.velocity[keep]
+        self.ids = self.ids[keep]
+        self.conf = self.conf[keep]
+        self.cls = self.cls[keep]
+        self.missed = self.missed[keep]
+        self.age = self.age[keep]
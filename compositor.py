@@ -0,0 +1,80 @@
+#프레임 위에 그릴 것(차선, 박스, 라벨, 아이콘, 배너, 글자)을 모아뒀다가 한번에 그리는 모듈
+#처리 중에는 그리기 명령만 쌓고, 화면(GUI)이나 VideoWriter 처럼 픽셀이 필요한 곳이 있을 때만 render
+#아무도 결과 이미지를 안 보는 경우(서버 배치 작업 등)에는 discard 로 버려서 그리기 비용이 없음
+
+
+import cv2
+
+import line_check_frame
+from label_atlas import LabelAtlas
+from sprites import SpriteBatch
+
+
+# --- 텍스트 배경 그리기 함수 ---
+def draw_text_with_background(img, text, org, font, scale, color, thickness):
+    (tw, th), base = cv2.getTextSize(text, font, scale, thickness)
+    x, y = org
+    cv2.rectangle(img, (x, y - th - base), (x + tw + 4, y + base), (0, 0, 0), -1)
+    cv2.putText(img, text, org, font, scale, color, thickness)
+
+
+#한 프레임 동안의 그리기 명령 모음
+#명령은 넣은 순서대로 그리고, 스프라이트(아이콘, 배너)는 마지막에 한번에 합성
+class AnnotationCompositor:
+    def __init__(self):
+        self.commands = []
+        self.sprites = SpriteBatch()
+        #거리 라벨용 글자 타일 (기본 label 설정과 같은 글꼴)
+        self.label_atlas = LabelAtlas()
+
+    #차선 영역 표시, lane : LaneTracker.last_lane, Minv : 역 원근변환 행렬 또는 RemapWarp
+    def lane(self, lane, Minv, overlay_cache=None):
+        if lane is not None:
+            self.commands.append(("lane", (lane, Minv, overlay_cache)))
+
+    def box(self, pt1, pt2, color, thickness):
+        self.commands.append(("box", (pt1, pt2, color, thickness)))
+
+    #검은 배경이 있는 글자 (거리 라벨 등)
+    def label(self, text, org, font=cv2.FONT_HERSHEY_SIMPLEX, scale=0.8, color=(255, 255, 0), thickness=2):
+        self.commands.append(("label", (text, org, font, scale, color, thickness)))
+
+    def text(self, text, org, font=cv2.FONT_HERSHEY_SIMPLEX, scale=0.8, color=(0, 255, 255), thickness=2):
+        self.commands.append(("text", (text, org, font, scale, color, thickness)))
+
+    def circle(self, center, radius, color, thickness):
+        self.commands.append(("circle", (center, radius, color, thickness)))
+
+    #아이콘, 배너 같은 Sprite
+    def sprite(self, sprite, x, y):
+        self.sprites.add(sprite, x, y)
+
+    def __len__(self):
+        return len(self.commands) + len(self.sprites)
+
+    #쌓인 명령을 frame 에 모두 그리고 비움 (frame 을 직접 수정)
+    def render(self, frame):
+        for kind, args in self.commands:
+            if kind == "lane":
+                lane, Minv, overlay_cache = args
+                line_check_frame.draw_lane_area_with_labels(frame, Minv=Minv, overlay_cache=overlay_cache, **lane)
+            elif kind == "box":
+                cv2.rectangle(frame, *args)
+            elif kind == "label":
+                text, org, font, scale, color, thickness = args
+                if self.label_atlas.matches(font, scale, color, thickness) and self.label_atlas.can_draw(text):
+                    self.label_atlas.draw(frame, text, org)
+                else:
+                    draw_text_with_background(frame, *args)
+            elif kind == "text":
+                cv2.putText(frame, *args)
+            elif kind == "circle":
+                cv2.circle(frame, *args)
+        self.commands.clear()
+        self.sprites.flush(frame)
+        return frame
+
+    #그리지 않고 버림
+    def discard(self):
+        self.commands.clear()
+        self.sprites.clear()
@@ -0,0 +1,271 @@
+#객체 검출기(YOLO) 호출 모듈
+#ultralytics(torch) 와 OpenCV DNN(ONNX) 두 가지 backend 를 같은 형태로 사용
+#검출은 차선 영역 주변(지평선 아래 + 좌우 여유)만 잘라서 작은 입력 크기로 돌리고
+#결과 박스는 원본 프레임 좌표로 되돌려 공통 배열 형태로 반환
+#박스 배열 : (N, 6) float32, 열 순서 x1, y1, x2, y2, conf, cls
+
+
+from abc import ABC, abstractmethod
+
+import cv2
+import numpy as np
+
+
+#검출할 영역 (프레임에서 잘라낼 사각형)
+#frame_size : (w, h), vanishing_point : 소실점 (x, y), lane_src : 원근 변환 사다리꼴 (4, 2)
+#above_horizon : 소실점 위로 더 포함할 높이 (프레임 높이 비율, 가까운 큰 차량의 윗부분용)
+#side_margin : 차선 사다리꼴 좌우로 더 포함할 폭 (프레임 폭 비율, 옆 차선용)
+class DetectorROI:
+    def __init__(self, frame_size, vanishing_point, lane_src, above_horizon=0.15, side_margin=0.1):
+        w, h = frame_size
+        lane_src = np.asarray(lane_src, dtype=np.float32)
+        x0 = lane_src[:, 0].min() - side_margin * w
+        x1 = lane_src[:, 0].max() + side_margin * w
+        y0 = min(vanishing_point[1], lane_src[:, 1].min()) - above_horizon * h
+        self.x0 = int(np.clip(x0, 0, w - 1))
+        self.x1 = int(np.clip(np.ceil(x1), self.x0 + 1, w))
+        self.y0 = int(np.clip(y0, 0, h - 1))
+        self.y1 = h
+
+    #perspective_calibration 의 보정 결과 dict 로 만들기
+    @classmethod
+    def from_perspective(cls, perspective, frame_size, **kwargs):
+        return cls(frame_size, perspective["vanishing_point"], perspective["src"], **kwargs)
+
+    @property
+    def rect(self):
+        return self.x0, self.y0, self.x1, self.y1
+
+    #잘라낸 영역 (복사 없이 view)
+    def crop(self, frame):
+        return frame[self.y0:self.y1, self.x0:self.x1]
+
+    #잘라낸 영역 좌표의 박스를 프레임 좌표로 (boxes 를 직접 수정)
+    def to_frame(self, boxes):
+        boxes[:, [0, 2]] += self.x0
+        boxes[:, [1, 3]] += self.y0
+        return boxes
+
+
+#letterbox 결과를 매번 새로 만들지 않고 미리 잡아둔 (N, 3, H, W) float32 버퍼에 바로 채우는 클래스
+#리사이즈는 고정 버퍼에, 채널 순서 바꾸기(BGR -> RGB)와 0~1 정규화는 버퍼의 이미지 영역에 한번에 씀
+#여백(114)은 버퍼를 만들 때 한번만 채움
+#계산 방식은 ultralytics 의 LetterBox / scale_boxes 와 같아서 같은 입력이면 같은 박스가 나옴
+#imgsz : 목표 크기 (정사각형), stride : auto 일 때 여백을 맞출 배수, auto : 여백을 stride 배수까지만 (직사각형 입력)
+#max_batch : 버퍼에 미리 잡아둘 프레임 수 (검출할 프레임 수가 호출마다 달라도 다시 잡지 않도록 최대 묶음 크기로)
+class LetterboxBuffer:
+    def __init__(self, imgsz=640, stride=32, auto=False, fill=114, max_batch=1):
+        self.imgsz = imgsz
+        self.stride = stride
+        self.auto = auto
+        self.fill = fill
+        self.max_batch = max_batch
+        self.key = None
+        self.blob = None
+        self.resized = None
+        self.layout = None
+
+    #입력 크기 (h, w) 에 대한 배치 : (출력 h, 출력 w, 리사이즈 h, 리사이즈 w, 위 여백, 왼쪽 여백)
+    def compute_layout(self, h, w):
+        r = min(self.imgsz / h, self.imgsz / w)
+        nw, nh = int(round(w * r)), int(round(h * r))
+        dw, dh = self.imgsz - nw, self.imgsz - nh
+        if self.auto:
+            dw, dh = dw % self.stride, dh % self.stride
+        dw, dh = dw / 2, dh / 2
+        top, bottom = int(round(dh - 0.1)), int(round(dh + 0.1))
+        left, right = int(round(dw - 0.1)), int(round(dw + 0.1))
+        return nh + top + bottom, nw + left + right, nh, nw, top, left
+
+    #images : 같은 크기의 BGR 이미지 리스트
+    #반환 : 버퍼 앞쪽 len(images) 장의 view (다음 호출 때 덮어써짐)
+    #버퍼는 입력 크기가 바뀌거나 max_batch 보다 많이 들어올 때만 다시 잡음
+    def __call__(self, images):
+        h, w = images[0].shape[:2]
+        n = len(images)
+        if (h, w) != self.key or n > len(self.blob):
+            self.key = (h, w)
+            self.max_batch = max(self.max_batch, n)
+            self.layout = self.compute_layout(h, w)
+            out_h, out_w, nh, nw, _, _ = self.layout
+            self.blob = np.full((self.max_batch, 3, out_h, out_w), np.float32(self.fill) / np.float32(255),
+                                dtype=np.float32)
+            self.resized = np.empty((nh, nw, 3), dtype=np.uint8)
+        _, _, nh, nw, top, left = self.layout
+        region = self.blob[:n, :, top:top + nh, left:left + nw]
+        for i, image in enumerate(images):
+            if (h, w) == (nh, nw):
+                src = image
+            else:
+                src = cv2.resize(image, (nw, nh), dst=self.resized, interpolation=cv2.INTER_LINEAR)
+            for c in range(3):
+                np.divide(src[:, :, 2 - c], np.float32(255), out=region[i, c], casting="unsafe")
+        return self.blob[:n]
+
+    #letterbox 좌표 박스 -> 입력 이미지 좌표 (boxes 를 직접 수정), shape : 입력 이미지 (h, w)
+    def to_image(self, boxes, shape):
+        h, w = shape
+        out_h, out_w = self.blob.shape[2:]
+        gain = min(out_h / h, out_w / w)
+        pad_x = round((out_w - w * gain) / 2 - 0.1)
+        pad_y = round((out_h - h * gain) / 2 - 0.1)
+        boxes[:, [0, 2]] = np.clip((boxes[:, [0, 2]] - pad_x) / gain, 0, w)
+        boxes[:, [1, 3]] = np.clip((boxes[:, [1, 3]] - pad_y) / gain, 0, h)
+        return boxes
+
+
+#검출기 공통 형태
+#infer 는 입력 이미지 좌표의 박스 배열 리스트를 반환하고, 검출 영역 좌표 되돌리기는 여기서 처리
+#backend 마다 infer 를 반드시 구현 (구현하지 않으면 객체를 만들 때 TypeError)
+class Detector(ABC):
+    #추론을 OpenCV 안에서 하는지 (cv2.setNumThreads 가 검출기에도 적용되는지)
+    uses_opencv = False
+
+    #frames : 프레임 리스트 (한번의 호출로 묶어서 추론), roi : DetectorROI 또는 None (프레임 전체)
+    #반환 : 프레임 순서대로 박스 배열 리스트 (프레임 좌표)
+    def __call__(self, frames, roi=None):
+        images = frames if roi is None else [roi.crop(frame) for frame in frames]
+        detections = self.infer(images)
+        if roi is not None:
+            for boxes in detections:
+                roi.to_frame(boxes)
+        return detections
+
+    #images : 이미지 리스트, 반환 : 이미지 순서대로 박스 배열 리스트 (이미지 좌표)
+    @abstractmethod
+    def infer(self, images):
+        pass
+
+    #빈 프레임으로 한번 돌려서 첫 프레임 지연(메모리 할당, 커널 준비 등)을 미리 치름
+    #shape : 프레임 (h, w, 3), roi : 실제 검출에 쓸 DetectorROI (입력 버퍼가 잘라낸 크기로 잡히도록)
+    def warm_up(self, shape, roi=None):
+        self([np.zeros(shape, dtype=np.uint8)], roi)
+
+
+#ultralytics YOLO 모델 (torch 사용)
+#ultralytics 의 predictor 전처리(letterbox 복사, 전치 복사, float 텐서 생성)를 건너뛰고
+#LetterboxBuffer 를 torch.from_numpy 로 감싼 텐서(메모리 공유)를 모델에 바로 넣은 뒤 NMS 만 ultralytics 것을 사용
+#imgsz : 네트워크 입력 크기, classes : 검출할 클래스 번호 (NMS 전에 걸러짐), None 이면 전체
+#max_batch : 한번에 넣을 최대 프레임 수 (입력 버퍼를 이 크기로 잡아둠)
+class UltralyticsDetector(Detector):
+    def __init__(self, model, imgsz=640, conf=0.3, iou=0.5, classes=None, max_det=300, max_batch=1):
+        import torch
+        from ultralytics.utils import ops
+        self.torch = torch
+        self.ops = ops
+        self.model = model
+        self.imgsz = imgsz
+        self.conf = conf
+        self.iou = iou
+        self.classes = list(classes) if classes is not None else None
+        self.max_det = max_det
+        self.max_batch = max_batch
+        self.backend = None
+        self.letterbox = None
+        self.tensor = None
+        self.tensor_blob = None
+
+    #path : .pt 모델 경로, ultralytics 는 이 backend 를 쓸 때만 불러옴
+    @classmethod
+    def load(cls, path, **kwargs):
+        from ultralytics import YOLO
+        return cls(YOLO(path), **kwargs)
+
+    #ultralytics 가 준비한 모델(AutoBackend: 장치, fuse, half 설정 완료)을 한번 만들어 두고 사용
+    def setup(self):
+        if self.model.predictor is None:
+            self.model(np.zeros((self.imgsz, self.imgsz, 3), dtype=np.uint8), imgsz=self.imgsz, verbose=False)
+        self.backend = self.model.predictor.model
+        self.letterbox = LetterboxBuffer(self.imgsz, stride=int(self.backend.stride), auto=bool(self.backend.pt),
+                                         max_batch=self.max_batch)
+
+    #버퍼 전체를 새로 잡았을 때만 텐서를 다시 감싸고, 앞쪽 count 장만 잘라서 씀 (CPU 면 복사 없음)
+    def to_tensor(self, count):
+        blob = self.letterbox.blob
+        if blob is not self.tensor_blob:
+            self.tensor_blob = blob
+            self.tensor = self.torch.from_numpy(blob)
+        tensor = self.tensor[:count].to(self.backend.device)
+        return tensor.half() if self.backend.fp16 else tensor
+
+    def infer(self, images):
+        if self.backend is None:
+            self.setup()
+        self.letterbox(images)
+        with self.torch.inference_mode():
+            preds = self.backend(self.to_tensor(len(images)))
+            results = self.ops.non_max_suppression(preds, self.conf, self.iou, classes=self.classes,
+                                                   max_det=self.max_det)
+        shape = images[0].shape[:2]
+        return [self.letterbox.to_image(result.cpu().numpy().astype(np.float32), shape) for result in results]
+
+
+#OpenCV DNN 으로 돌리는 ONNX 모델 (best.pt 를 yolo export format=onnx 로 변환한 것)
+#torch 없이 동작하고, letterbox(LetterboxBuffer) 와 NMS 를 직접 처리
+#출력 형식 : (1, 4 + 클래스 수, 후보 수), 후보마다 cx, cy, w, h, 클래스별 점수
+#imgsz : export 할 때의 입력 크기 (정사각형), max_det : 프레임당 최대 박스 수
+#max_batch : 다른 backend 와 같은 인자 (export 된 입력이 1장이라 한장씩 추론하므로 사용 안함)
+class OnnxDetector(Detector):
+    uses_opencv = True
+
+    def __init__(self, path, imgsz=640, conf=0.3, iou=0.5, classes=None, max_det=300, max_batch=1):
+        self.net = cv2.dnn.readNetFromONNX(str(path))
+        self.imgsz = imgsz
+        self.conf = conf
+        self.iou = iou
+        self.classes = np.array(sorted(classes), dtype=np.int64) if classes is not None else None
+        self.max_det = max_det
+        #export 된 입력 크기가 고정이므로 항상 정사각형으로 채움
+        self.letterbox = LetterboxBuffer(imgsz, auto=False)
+
+    @classmethod
+    def load(cls, path, **kwargs):
+        return cls(path, **kwargs)
+
+    def infer(self, images):
+        detections = []
+        for image in images:
+            self.net.setInput(self.letterbox([image]))
+            output = self.net.forward()
+            detections.append(self.letterbox.to_image(self.postprocess(output), image.shape[:2]))
+        return detections
+
+    #네트워크 출력 -> letterbox 좌표의 박스 배열 (클래스별 NMS)
+    def postprocess(self, output):
+        preds = output[0].T
+        scores = preds[:, 4:]
+        if self.classes is not None:
+            scores = scores[:, self.classes]
+        best = scores.argmax(axis=1)
+        conf = scores[np.arange(len(scores)), best]
+        keep = conf > self.conf
+        if not keep.any():
+            return np.zeros((0, 6), dtype=np.float32)
+        preds, conf, best = preds[keep], conf[keep], best[keep]
+        class_ids = self.classes[best] if self.classes is not None else best
+
+        #cx, cy, w, h -> x, y, w, h (NMS 입력)
+        xywh = preds[:, :4].copy()
+        xywh[:, :2] -= xywh[:, 2:] / 2
+        indices = cv2.dnn.NMSBoxesBatched(xywh.tolist(), conf.tolist(), class_ids.tolist(), self.conf, self.iou)
+        indices = np.asarray(indices, dtype=np.int64).reshape(-1)[:self.max_det]
+
+        boxes = np.empty((len(indices), 6), dtype=np.float32)
+        boxes[:, :2] = xywh[indices, :2]
+        boxes[:, 2:4] = xywh[indices, :2] + xywh[indices, 2:]
+        boxes[:, 4] = conf[indices]
+        boxes[:, 5] = class_ids[indices]
+        return boxes
+
+
+DETECTOR_BACKENDS = {
+    "ultralytics": UltralyticsDetector,
+    "onnx": OnnxDetector,
+}
+
+
+#backend : "ultralytics" 또는 "onnx", path : 모델 파일 경로, kwargs : imgsz, conf, iou, classes
+def create_detector(backend, path, **kwargs):
+    if backend not in DETECTOR_BACKENDS:
+        raise ValueError(f"Unknown detector backend: {backend}")
+    return DETECTOR_BACKENDS[backend].load(path, **kwargs)
@@ -0,0 +1,146 @@
+#영상 읽기(디코딩 + 크기 조정)를 전용 스레드에서 미리 해두는 모듈
+#처리 스레드는 큐에서 꺼내 쓰기만 하므로 디코딩 시간이 처리 시간에 더해지지 않고 겹쳐서 진행됨
+#큐 크기를 제한해서 처리보다 읽기가 빠를 때 메모리가 계속 늘어나지 않음
+#실시간 모드는 영상 시각에 맞춰 읽고 가장 최근 프레임 한장만 남겨서(밀린 프레임은 버림) 지연이 쌓이지 않음
+
+
+import queue
+import threading
+import time
+from collections import namedtuple
+
+import cv2
+
+#index : 0 부터 시작하는 프레임 번호, timestamp : 영상 기준 시각(ms, CAP_PROP_POS_MSEC), image : 크기 조정된 BGR
+#arrived : 프레임이 들어온 시각 (time.monotonic, 지연 계산용)
+Frame = namedtuple("Frame", ["index", "timestamp", "image", "arrived"], defaults=[None])
+
+
+#source : 영상 경로 또는 카메라 번호, size : 크기 조정할 (w, h), queue_size : 미리 읽어둘 최대 프레임 수
+#realtime : True 면 영상 시각에 맞춰 읽고 최근 프레임 한장만 유지 (queue_size 는 무시)
+class FrameSource:
+    def __init__(self, source, size, queue_size=8, realtime=False):
+        self.source = source
+        self.size = tuple(size)
+        self.camera = str(source).isdigit()
+        self.cap = cv2.VideoCapture(int(source) if self.camera else str(source))
+        #cap 은 읽기 스레드가 시작된 뒤에는 읽기 스레드만 쓰므로 필요한 값은 여기서 미리 읽어둠
+        self.is_opened = self.cap.isOpened()
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 30
+        self.frame_count = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.realtime = realtime
+        self.queue = queue.Queue(maxsize=1 if realtime else queue_size)
+        #실시간 모드에서 처리하기 전에 새 프레임에 밀려 버려진 프레임 수, 처리한 프레임의 지연 (초)
+        self.dropped = 0
+        self.processed = 0
+        self.total_lag = 0.0
+        self.max_lag = 0.0
+        self.stopped = threading.Event()
+        self.finished = False
+        self.thread = threading.Thread(target=self.produce, name="frame-source", daemon=True)
+        self.thread.start()
+
+    @property
+    def opened(self):
+        return self.is_opened
+
+    #stop 이 불렸는지 (처리 루프가 종료 조건으로 확인)
+    @property
+    def stopping(self):
+        return self.stopped.is_set()
+
+    #읽기 스레드 : 끝나거나 stop 이 불리면 None 을 넣고 종료
+    def produce(self):
+        index = 0
+        clock_start = None
+        while not self.stopped.is_set():
+            ret, image = self.cap.read()
+            if not ret:
+                break
+            timestamp = self.cap.get(cv2.CAP_PROP_POS_MSEC)
+            if timestamp <= 0 and index > 0:
+                #POS_MSEC 를 주지 않는 backend 는 fps 로 계산
+                timestamp = index * 1000.0 / self.fps
+            if self.realtime and not self.camera:
+                #영상 파일은 첫 프레임 기준으로 영상 시각이 될 때까지 기다림 (카메라는 장치가 속도를 맞춤)
+                if clock_start is None:
+                    clock_start = time.monotonic() - timestamp / 1000.0
+                delay = clock_start + timestamp / 1000.0 - time.monotonic()
+                if delay > 0 and self.stopped.wait(delay):
+                    return
+            if (image.shape[1], image.shape[0]) != self.size:
+                image = cv2.resize(image, self.size)
+            frame = Frame(index, timestamp, image, time.monotonic())
+            if self.realtime:
+                self.replace(frame)
+            elif not self.put(frame):
+                return
+            index += 1
+        self.put(None)
+
+    #큐가 가득 차 있으면 자리가 날 때까지 기다리되, stop 이 불리면 포기
+    def put(self, item):
+        while not self.stopped.is_set():
+            try:
+                self.queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    #아직 처리하지 않은 프레임이 있으면 버리고 새 프레임으로 교체 (읽기 스레드 하나만 넣으므로 자리가 항상 생김)
+    def replace(self, frame):
+        try:
+            self.queue.get_nowait()
+            self.dropped += 1
+        except queue.Empty:
+            pass
+        self.queue.put_nowait(frame)
+
+    #다음 프레임 (Frame), 영상이 끝났거나 stop 이 불렸으면 None
+    #실시간 모드에서는 가장 최근 프레임이고, 새 프레임이 들어올 때까지 기다림
+    def read(self):
+        while not self.finished and not self.stopped.is_set():
+            try:
+                item = self.queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if item is None:
+                self.finished = True
+            return item
+        return None
+
+    #최대 count 장, 영상이 끝나면 읽은 만큼만
+    def read_batch(self, count):
+        frames = []
+        while len(frames) < count:
+            frame = self.read()
+            if frame is None:
+                break
+            frames.append(frame)
+        return frames
+
+    #프레임 처리가 끝났을 때 호출, 들어온 뒤 지금까지의 지연(초)을 기록하고 반환
+    def record(self, frame):
+        lag = time.monotonic() - frame.arrived
+        self.processed += 1
+        self.total_lag += lag
+        self.max_lag = max(self.max_lag, lag)
+        return lag
+
+    def stats(self):
+        mean_lag = self.total_lag / self.processed if self.processed else 0.0
+        return {"processed": self.processed, "dropped": self.dropped,
+                "mean_lag_ms": mean_lag * 1000, "max_lag_ms": self.max_lag * 1000}
+
+    #읽기를 멈추라고 알리기만 함 (어느 스레드에서 불러도 됨, 여러번 불러도 됨)
+    def stop(self):
+        self.stopped.set()
+
+    #읽기 스레드를 멈추고 끝날 때까지 기다린 뒤 영상을 닫음
+    #FrameSource 를 만든 (처리) 스레드에서 호출
+    def close(self):
+        self.stop()
+        if self.thread.is_alive() and self.thread is not threading.current_thread():
+            self.thread.join()
+        self.cap.release()
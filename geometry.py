@@ -0,0 +1,197 @@
+#카메라 왜곡 보정과 원근 변환을 한번의 remap 으로 처리하는 모듈
+#매 프레임 warpPerspective 가 픽셀마다 변환을 다시 계산하는 대신
+#왜곡 보정 + 원근 변환을 합친 고정소수점 remap 테이블을 한번만 만들어 디스크에 캐시해 두고 재사용
+
+
+import configparser
+import hashlib
+import os
+from pathlib import Path
+
+import cv2 as cv
+import numpy as np
+
+resource_path = Path(__file__).parent / "resource"
+CAMERA_INI_PATH = resource_path / "camera.ini"
+CACHE_DIR = resource_path / "cache"
+#디스크에 남겨둘 remap 캐시 파일 수 (720p 기준 파일 하나에 약 9MB)
+#넘으면 가장 오래 쓰지 않은 파일부터 삭제
+REMAP_CACHE_LIMIT = 4
+
+
+#카메라 내부 파라미터와 왜곡 계수
+#K : 3x3 카메라 행렬, dist : 왜곡 계수(k1, k2, p1, p2, k3), size : 보정할 때의 이미지 크기 (w, h)
+class CameraCalibration:
+    def __init__(self, K=None, dist=None, size=None):
+        self.K = None if K is None else np.asarray(K, dtype=np.float64)
+        self.dist = np.zeros(5) if dist is None else np.asarray(dist, dtype=np.float64).ravel()
+        self.size = size
+
+    #ini 파일의 [CAMERA] 섹션에서 읽어옴, 파일이나 섹션이 없으면 왜곡 없는 카메라로 취급
+    @classmethod
+    def from_ini(cls, path=CAMERA_INI_PATH):
+        config = configparser.ConfigParser()
+        config.read(path)
+        if "CAMERA" not in config:
+            return cls()
+        cam = config["CAMERA"]
+        K = [[cam.getfloat("fx"), 0, cam.getfloat("cx")],
+             [0, cam.getfloat("fy"), cam.getfloat("cy")],
+             [0, 0, 1]]
+        dist = [cam.getfloat(name, fallback=0.0) for name in ("k1", "k2", "p1", "p2", "k3")]
+        size = (cam.getint("width"), cam.getint("height"))
+        return cls(K, dist, size)
+
+    #왜곡 계수가 전부 0 이면 왜곡 보정이 필요 없음
+    @property
+    def is_identity(self):
+        return self.K is None or not np.any(self.dist)
+
+    #보정할 때와 다른 해상도로 쓸 때 카메라 행렬을 크기에 맞게 조정
+    #frame_size : (w, h)
+    def scaled_K(self, frame_size):
+        sx = frame_size[0] / self.size[0]
+        sy = frame_size[1] / self.size[1]
+        return np.array([[self.K[0, 0] * sx, 0, self.K[0, 2] * sx],
+                         [0, self.K[1, 1] * sy, self.K[1, 2] * sy],
+                         [0, 0, 1]])
+
+    def key_bytes(self):
+        if self.is_identity:
+            return b"identity"
+        return self.K.tobytes() + self.dist.tobytes() + np.array(self.size).tobytes()
+
+    #왜곡된 원본 픽셀 좌표 -> 왜곡 보정된 픽셀 좌표
+    #pts : (N, 1, 2) float32
+    def undistort_points(self, pts, frame_size):
+        if self.is_identity:
+            return pts
+        K = self.scaled_K(frame_size)
+        return cv.undistortPoints(pts, K, self.dist, P=K).astype(np.float32)
+
+    #왜곡 보정된 픽셀 좌표 -> 왜곡된 원본 픽셀 좌표
+    def distort_points(self, pts, frame_size):
+        if self.is_identity:
+            return pts
+        K = self.scaled_K(frame_size)
+        pts = pts.reshape(-1, 2).astype(np.float64)
+        #정규화 좌표로 만든 뒤 z=1 평면의 3D 점으로 보고 projectPoints 로 왜곡 적용
+        normalized = np.empty((len(pts), 3))
+        normalized[:, 0] = (pts[:, 0] - K[0, 2]) / K[0, 0]
+        normalized[:, 1] = (pts[:, 1] - K[1, 2]) / K[1, 1]
+        normalized[:, 2] = 1.0
+        projected, _ = cv.projectPoints(normalized, np.zeros(3), np.zeros(3), K, self.dist)
+        return projected.astype(np.float32)
+
+
+#왜곡 보정 + 원근 변환을 합친 remap 테이블
+#M / Minv 행렬 대신 line_check 함수들에 그대로 넘길 수 있음 (warp, 역투영, 좌표 변환 모두 지원)
+#M : 원근 변환 행렬, Minv : 역 원근 변환 행렬, frame_size : 원본 (w, h), canvas_size : 원근 변환 결과 (w, h)
+#cache_limit : cache_dir 에 남겨둘 remap 캐시 파일 수
+class RemapWarp:
+    def __init__(self, M, Minv, calibration=None, frame_size=(1280, 720), canvas_size=None, cache_dir=CACHE_DIR,
+                 cache_limit=REMAP_CACHE_LIMIT):
+        self.M = np.asarray(M, dtype=np.float64)
+        self.Minv = np.asarray(Minv, dtype=np.float64)
+        self.calibration = calibration if calibration is not None else CameraCalibration()
+        self.frame_size = tuple(frame_size)
+        self.canvas_size = tuple(canvas_size) if canvas_size is not None else self.frame_size
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self.cache_limit = cache_limit
+        self.maps = self.load_or_build()
+
+    #캐시 키 : 보정값, 원본 해상도, 결과 크기, 원근 변환 행렬
+    def cache_key(self):
+        h = hashlib.sha1()
+        h.update(self.calibration.key_bytes())
+        h.update(np.array(self.frame_size + self.canvas_size).tobytes())
+        h.update(self.M.tobytes())
+        return h.hexdigest()[:16]
+
+    def load_or_build(self):
+        cache_file = None
+        if self.cache_dir is not None:
+            cache_file = self.cache_dir / f"remap_{self.cache_key()}.npz"
+            if cache_file.exists():
+                try:
+                    with np.load(cache_file) as data:
+                        #이전 버전 캐시에 들어있는 역방향 맵은 읽지 않음
+                        maps = {name: data[name] for name in data.files if name.startswith("fwd_")}
+                    #수정 시각을 마지막 사용 시각으로 씀 (prune_cache 에서 오래된 순으로 삭제)
+                    os.utime(cache_file)
+                    return maps
+                except (OSError, ValueError) as e:
+                    print(f"[RemapWarp] cache load failed ({e}), rebuilding")
+        maps = self.build_maps()
+        if cache_file is not None:
+            try:
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+                np.savez(cache_file, **maps)
+                self.prune_cache()
+            except OSError as e:
+                print(f"[RemapWarp] cache save failed: {e}")
+        return maps
+
+    #cache_limit 개를 넘는 remap 캐시 파일을 오래 쓰지 않은 순으로 삭제
+    def prune_cache(self):
+        files = sorted(self.cache_dir.glob("remap_*.npz"), key=lambda f: f.stat().st_mtime, reverse=True)
+        for old in files[max(1, self.cache_limit):]:
+            old.unlink()
+            print(f"[RemapWarp] removed old cache {old.name}")
+
+    #결과 이미지의 각 픽셀이 원본의 어디서 오는지 계산
+    #forward : 결과(canvas) 픽셀 -> Minv -> 왜곡 적용 -> 원본 픽셀
+    def build_maps(self):
+        cw, ch = self.canvas_size
+        canvas_pts = self.grid(cw, ch)
+        src_pts = cv.perspectiveTransform(canvas_pts, self.Minv)
+        src_pts = self.calibration.distort_points(src_pts, self.frame_size)
+        return self.fixed_point("fwd", src_pts.reshape(ch, cw, 2))
+
+    #inverse : 원본 픽셀 -> 왜곡 보정 -> M -> 결과(canvas) 픽셀 (역투영 이미지용)
+    #차선 표시는 점 단위 역투영(back_project)을 쓰므로 unwarp 를 처음 부를 때만 만들고 캐시 파일에는 저장 안함
+    def build_inverse_maps(self):
+        fw, fh = self.frame_size
+        frame_pts = self.calibration.undistort_points(self.grid(fw, fh), self.frame_size)
+        dst_pts = cv.perspectiveTransform(frame_pts, self.M)
+        return self.fixed_point("inv", dst_pts.reshape(fh, fw, 2))
+
+    @staticmethod
+    def grid(w, h):
+        u, v = np.meshgrid(np.arange(w, dtype=np.float32), np.arange(h, dtype=np.float32))
+        return np.stack([u, v], axis=-1).reshape(-1, 1, 2)
+
+    #float 좌표 맵을 remap 용 고정소수점 맵으로 변환
+    #선형 보간용 (map1, map2) 와 최근접 보간용 map1 을 따로 만듦 (최근접은 반올림이 필요해서)
+    @staticmethod
+    def fixed_point(prefix, xy):
+        map_x = np.ascontiguousarray(xy[..., 0], dtype=np.float32)
+        map_y = np.ascontiguousarray(xy[..., 1], dtype=np.float32)
+        map1, map2 = cv.convertMaps(map_x, map_y, cv.CV_16SC2)
+        nearest, _ = cv.convertMaps(map_x, map_y, cv.CV_16SC2, nninterpolation=True)
+        return {f"{prefix}_map1": map1, f"{prefix}_map2": map2, f"{prefix}_nearest": nearest}
+
+    def remap(self, img, prefix, flags, border_mode):
+        if flags == cv.INTER_NEAREST:
+            return cv.remap(img, self.maps[f"{prefix}_nearest"], None, cv.INTER_NEAREST, borderMode=border_mode)
+        return cv.remap(img, self.maps[f"{prefix}_map1"], self.maps[f"{prefix}_map2"], flags, borderMode=border_mode)
+
+    #원본 -> 원근 변환 (왜곡 보정 포함)
+    def warp(self, img, flags=cv.INTER_NEAREST, border_mode=cv.BORDER_CONSTANT):
+        return self.remap(img, "fwd", flags, border_mode)
+
+    #원근 변환 -> 원본 (왜곡 다시 적용)
+    def unwarp(self, img, flags=cv.INTER_NEAREST, border_mode=cv.BORDER_CONSTANT):
+        if "inv_map1" not in self.maps:
+            self.maps.update(self.build_inverse_maps())
+        return self.remap(img, "inv", flags, border_mode)
+
+    #원본 픽셀 좌표 -> 원근 변환 좌표, pts : (N, 1, 2) float32
+    def project_points(self, pts):
+        pts = self.calibration.undistort_points(np.asarray(pts, dtype=np.float32), self.frame_size)
+        return cv.perspectiveTransform(pts, self.M)
+
+    #원근 변환 좌표 -> 원본 픽셀 좌표, pts : (N, 1, 2) float32
+    def back_project(self, pts):
+        pts = cv.perspectiveTransform(np.asarray(pts, dtype=np.float32), self.Minv)
+        return self.calibration.distort_points(pts, self.frame_size)
@@ -0,0 +1,63 @@
+#원근 변환 행렬로 이미지 줄(y)마다 지면 거리를 미리 계산해 두는 모듈
+#사다리꼴의 윗변/아랫변이 수평이라 원본의 가로줄은 원근 변환 후에도 가로줄이 됨
+#그래서 원근 변환된 y 와 지면 거리는 원본 y 만으로 정해지고, 줄마다 한번만 계산해 두면
+#물체마다 perspectiveTransform 을 부를 필요 없이 표에서 바로 찾을 수 있음
+#원근 변환된 x 는 줄마다 x 에 대한 1차식이라 (기울기, 절편) 표로 같이 저장
+#이 가정은 왜곡 없는 원근 변환에서만 맞음, 렌즈 왜곡 보정이 들어간 geometry.RemapWarp 는
+#원본의 가로줄이 휘어서 원근 변환 y 가 x 에도 달라지므로 표 대신 점마다 변환(line_check_frame.transform_points)
+#표는 이 모듈의 물체 거리 계산에만 씀 (차선 검출과 구역 판단은 각자 M / Minv 로 변환)
+
+
+import numpy as np
+
+import line_check_frame
+
+
+#줄 단위 지면 거리 표 + 물체 크기 기반 거리 추정
+#M : 원근 변환 행렬 또는 geometry.RemapWarp, frame_size : (w, h)
+#far_cm : 원근 변환 이미지 맨 위(warped y = 0)에 해당하는 거리, min_cm : 지면 거리 최소값
+#focal_length : 물체 높이로 거리를 구할 때의 초점 거리(픽셀), height_weight : 높이 기반 거리의 비중
+class GroundDistanceModel:
+    def __init__(self, M, frame_size, far_cm=1200, min_cm=50, focal_length=400, height_weight=0.7):
+        self.frame_size = tuple(frame_size)
+        self.far_cm = far_cm
+        self.min_cm = min_cm
+        self.focal_length = focal_length
+        self.height_weight = height_weight
+        w, h = self.frame_size
+        self.rows = np.arange(h, dtype=np.float32)
+        self.M = M
+        #왜곡 보정이 있으면 줄 단위 표가 맞지 않으므로 점마다 변환
+        calibration = getattr(M, "calibration", None)
+        self.per_point = calibration is not None and not calibration.is_identity
+
+        #줄마다 왼쪽 끝, 오른쪽 끝 두 점을 원근 변환
+        pts = np.empty((h, 2, 2), dtype=np.float32)
+        pts[:, 0, 0] = 0
+        pts[:, 1, 0] = w - 1
+        pts[:, :, 1] = self.rows[:, None]
+        warped = line_check_frame.transform_points(pts.reshape(-1, 1, 2), M).reshape(h, 2, 2)
+        self.warped_y = warped[:, :, 1].mean(axis=1)
+        self.x_scale = (warped[:, 1, 0] - warped[:, 0, 0]) / (w - 1)
+        self.x_offset = warped[:, 0, 0]
+
+    #원근 변환된 y -> 지면 거리(cm), 원근 변환 이미지에서 아래로 갈수록 가까움
+    def ground_distance(self, warped_y):
+        return np.maximum(self.min_cm, self.far_cm * (1 - np.asarray(warped_y) / self.frame_size[1]))
+
+    #원본 좌표 -> 원근 변환 좌표, x, y : 같은 길이의 배열
+    #반환 : (N, 2)
+    def project(self, x, y):
+        if self.per_point:
+            pts = np.stack([x, y], axis=-1).astype(np.float32).reshape(-1, 1, 2)
+            return line_check_frame.transform_points(pts, self.M).reshape(-1, 2)
+        out = np.empty((len(y), 2), dtype=np.float32)
+        out[:, 0] = np.interp(y, self.rows, self.x_scale) * x + np.interp(y, self.rows, self.x_offset)
+        out[:, 1] = np.interp(y, self.rows, self.warped_y)
+        return out
+
+    #물체 거리(cm) = 높이 기반 거리와 지면 거리의 가중 평균
+    #warped_y : project 로 구한 박스 기준점의 원근 변환 y, pixel_height : 박스 높이(픽셀), known_height : 실제 높이(cm)
+    def distance(self, warped_y, pixel_height, known_height):
+        by_height = known_height * self.focal_length / pixel_height
+        return by_height * self.height_weight + self.ground_distance(warped_y) * (1 - self.height_weight)
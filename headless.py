@@ -0,0 +1,124 @@
+#GUI 없이 명령줄에서 영상 한개를 처리하는 실행 파일 (PyQt5 를 불러오지 않음, 화면 없는 서버용)
+#처리는 main.py 의 VideoThread 와 같은 pipeline.VideoPipeline 을 사용하고, 가능한 빨리(오프라인 모드) 처리
+#
+#예) python headless.py resource/test_video/project_video.mp4 --module line_check_hough \
+#       --backend onnx --output result.avi --codec MJPG
+
+
+import argparse
+import sys
+import threading
+import time
+
+from detector import DETECTOR_BACKENDS
+from video_writer import CODECS, POLICIES
+import pipeline
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Lane detection + YOLO warning pipeline without GUI")
+    parser.add_argument("video", help="input video path or camera index")
+    parser.add_argument("--module", default="line_check", choices=pipeline.LANE_MODULES,
+                        help="lane detection module")
+    parser.add_argument("--backend", default=pipeline.DETECTOR_BACKEND, choices=sorted(DETECTOR_BACKENDS),
+                        help="detector backend")
+    parser.add_argument("--model", default=None,
+                        help="detector model path (default: DETECTOR_MODEL_PATHS of the backend)")
+    parser.add_argument("--output", default=None, help="result video path (default: no output, no drawing)")
+    parser.add_argument("--codec", default=pipeline.OUTPUT_CODEC, choices=sorted(CODECS), help="result video codec")
+    parser.add_argument("--writer-policy", default=pipeline.WRITER_POLICY, choices=POLICIES,
+                        help="what to do when the writer queue is full")
+    parser.add_argument("--batch-size", type=int, default=pipeline.OFFLINE_BATCH_SIZE,
+                        help="frames per YOLO call")
+    parser.add_argument("--detect-interval", type=int, default=pipeline.DETECT_INTERVAL,
+                        help="run YOLO every N frames, track boxes in between")
+    parser.add_argument("--sequential", action="store_true",
+                        help="run lane detection and YOLO one after another instead of concurrently")
+    parser.add_argument("--send", action="store_true", help="send warnings to the server in serverinfo.ini")
+    parser.add_argument("--progress", type=int, default=100, help="print progress every N frames (0: off)")
+    return parser.parse_args(argv)
+
+
+#every 프레임마다 진행 상황 출력 (VideoPipeline 의 progress_callback)
+#전체 프레임 수는 영상을 연 뒤에 알 수 있으므로 출력할 때 video.source 에서 읽음 (카메라 등 모르면 0)
+class ProgressReporter:
+    def __init__(self, video, every):
+        self.video = video
+        self.every = every
+        self.count = 0
+        self.start = None
+
+    def __call__(self, frame, lag):
+        if self.start is None:
+            self.start = time.time()
+        self.count += 1
+        if self.every <= 0 or self.count % self.every != 0:
+            return
+        # 첫 프레임이 나온 시각부터 재므로 첫 프레임은 빼고 계산
+        fps = (self.count - 1) / max(time.time() - self.start, 1e-6)
+        total = self.video.source.frame_count
+        if total > 0:
+            print(f"[headless] {self.count}/{total} frames ({self.count / total * 100:.1f}%) {fps:.1f} fps")
+        else:
+            print(f"[headless] {self.count} frames {fps:.1f} fps")
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    # 검출기 backend / 모델 경로를 인자로 바꿔서 등록 (불러오기 전이므로 기본 등록을 덮어씀)
+    pipeline.models.register("detector", lambda: pipeline.load_detector(args.backend, args.model))
+
+    socket_client = None
+    if args.send:
+        from socketUtil.socketClient import SocketClient
+        socket_client = SocketClient()
+        socket_client.socket_connet()
+        socket_client.start()
+
+    video = pipeline.VideoPipeline(args.module, args.video, args.output,
+                                   concurrent=not args.sequential, batch_size=args.batch_size,
+                                   detect_interval=args.detect_interval, realtime=False,
+                                   output_codec=args.codec, writer_policy=args.writer_policy,
+                                   socket_client=socket_client)
+    video.progress_callback = ProgressReporter(video, args.progress)
+
+    # 처리는 작업 스레드에서, 이 스레드는 Ctrl+C 를 받으면 stop 해서 결과 파일까지 정상적으로 닫히게 함
+    # (join 대신 Event 로 기다림, join 이 Ctrl+C 로 끊기면 스레드가 끝난 것으로 잘못 보일 수 있음)
+    result = []
+    done = threading.Event()
+
+    def work():
+        try:
+            result.append(video.run())
+        finally:
+            done.set()
+
+    worker = threading.Thread(target=work, name="pipeline")
+    worker.start()
+    interrupted = False
+    while not done.is_set():
+        try:
+            done.wait(0.5)
+        except KeyboardInterrupt:
+            print("[headless] interrupted, stopping")
+            interrupted = True
+            video.stop()
+    worker.join()
+    if socket_client is not None:
+        socket_client.stop()
+
+    stats = result[0] if result else None
+    if stats is None:
+        print("[headless] failed to start")
+        return 1
+    if stats["processed"] == 0 and not interrupted:
+        print(f"[headless] no frames read from {args.video}")
+        return 1
+    print(f"[headless] {'stopped' if interrupted else 'done'}: {stats['processed']} frames "
+          f"in {stats['elapsed']:.1f}s ({stats['fps']:.1f} fps, mean latency {stats['mean_lag_ms']:.1f}ms)")
+    return 130 if interrupted else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
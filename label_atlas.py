@@ -0,0 +1,143 @@
+#자주 쓰는 글자를 미리 그려두고 프레임마다 배열 복사로 붙이는 모듈
+#Hershey 폰트 putText / getTextSize 는 객체가 많을 때 생각보다 비싸서
+#거리 라벨("12.3m")은 글자 하나씩(숫자, '.', 'm') 미리 그려둔 모양을 이어 붙이고
+#차선 라벨("Left: dashed" 등)은 투명 배경 스프라이트로 미리 만들어 둠
+
+
+import cv2
+import numpy as np
+
+from sprites import Sprite
+
+
+#배경이 있는 라벨용 글자 모음
+#draw_text_with_background 와 같은 모양 (검은 배경 사각형 + 글자, 오른쪽 4px 여백)
+#글자마다 글자 모양(alpha)을 미리 그려두고, 라벨은 글자 간격(advance)만큼 옮겨가며 max 로 합침
+#putText 는 글자를 하나씩 이어 그리므로 글자별로 그린 것을 합친 것과 (겹치는 가장자리 외에는) 같음
+#chars : 미리 그릴 글자들, max_cached : 조합된 라벨을 저장해 둘 최대 개수
+class LabelAtlas:
+    def __init__(self, chars="0123456789.m", font=cv2.FONT_HERSHEY_SIMPLEX, scale=0.8,
+                 color=(255, 255, 0), thickness=2, background=(0, 0, 0), max_cached=512):
+        self.font = font
+        self.scale = scale
+        self.color = tuple(color)
+        self.thickness = thickness
+        self.background = tuple(background)
+        self.max_cached = max_cached
+        #Hershey 폰트의 높이는 글자와 상관없이 일정
+        self.text_height = cv2.getTextSize(chars, font, scale, thickness)[0][1]
+        #글자 모양이 기준 위치 밖으로 나가는 만큼의 여백
+        self.margin = thickness + 2
+        self.top = self.text_height // 2
+        glyph_height = self.text_height + 2 * self.top
+        self.glyphs = {}
+        self.advance = {}
+        for ch in chars:
+            cw = self.text_width(ch)
+            #같은 글자 두개의 폭 - 한개의 폭 = 다음 글자까지의 간격
+            self.advance[ch] = self.text_width(ch * 2) - cw
+            glyph = np.zeros((glyph_height, cw + 2 * self.margin), dtype=np.uint8)
+            cv2.putText(glyph, ch, (self.margin, self.top + self.text_height), font, scale, 255, thickness)
+            self.glyphs[ch] = glyph
+        self.cache = {}
+
+    def text_width(self, text):
+        return cv2.getTextSize(text, self.font, self.scale, self.thickness)[0][0]
+
+    #같은 글꼴 설정인지 (다르면 호출하는 쪽에서 putText 로 그려야 함)
+    def matches(self, font, scale, color, thickness):
+        return (font == self.font and scale == self.scale and
+                tuple(color) == self.color and thickness == self.thickness)
+
+    def can_draw(self, text):
+        return len(text) > 0 and all(ch in self.glyphs for ch in text)
+
+    #글자 모양을 합친 라벨 이미지 (배경 사각형 크기)
+    #반환 : (이미지, 기준선에서 이미지 위쪽까지의 높이)
+    def compose(self, text):
+        entry = self.cache.get(text)
+        if entry is None:
+            (tw, th), base = cv2.getTextSize(text, self.font, self.scale, self.thickness)
+            #rectangle 은 양 끝 좌표를 포함하므로 +1
+            width, height = tw + 5, th + 2 * base + 1
+            mask = np.zeros((self.glyphs[text[0]].shape[0], width + 2 * self.margin), dtype=np.uint8)
+            x = 0
+            for ch in text:
+                glyph = self.glyphs[ch]
+                w = min(glyph.shape[1], mask.shape[1] - x)
+                np.maximum(mask[:, x:x + w], glyph[:, :w], out=mask[:, x:x + w])
+                x += self.advance[ch]
+            y0 = self.top - base
+            mask = mask[y0:y0 + height, self.margin:self.margin + width]
+            #배경색과 글자색을 글자 모양(alpha) 비율로 섞음
+            alpha = mask[:, :, None].astype(np.float32) / 255.0
+            image = np.float32(self.background) * (1 - alpha) + np.float32(self.color) * alpha
+            image = np.round(image).astype(np.uint8)
+            if len(self.cache) >= self.max_cached:
+                self.cache.clear()
+            entry = (image, th + base)
+            self.cache[text] = entry
+        return entry
+
+    #org : putText 와 같은 글자 기준선 왼쪽 좌표, frame 을 직접 수정
+    def draw(self, frame, text, org):
+        image, above = self.compose(text)
+        x = org[0]
+        y = org[1] - above
+        ih, iw = image.shape[:2]
+        fh, fw = frame.shape[:2]
+        fx0, fy0 = max(x, 0), max(y, 0)
+        fx1, fy1 = min(x + iw, fw), min(y + ih, fh)
+        if fx0 >= fx1 or fy0 >= fy1:
+            return frame
+        frame[fy0:fy1, fx0:fx1] = image[fy0 - y:fy1 - y, fx0 - x:fx1 - x]
+        return frame
+
+
+#배경 없이 글자만 있는 텍스트를 투명 스프라이트로 만들어 두는 캐시 (안티앨리어싱 유지)
+class TextSpriteCache:
+    def __init__(self, font=cv2.FONT_HERSHEY_SIMPLEX, scale=0.8, thickness=2, line_type=cv2.LINE_AA):
+        self.font = font
+        self.scale = scale
+        self.thickness = thickness
+        self.line_type = line_type
+        self.pad = thickness + 1
+        self.sprites = {}
+
+    def preload(self, texts, color):
+        for text in texts:
+            self.get(text, color)
+
+    def get(self, text, color):
+        key = (text, tuple(color))
+        sprite = self.sprites.get(key)
+        if sprite is None:
+            (tw, th), base = cv2.getTextSize(text, self.font, self.scale, self.thickness)
+            h, w = th + base + 2 * self.pad, tw + 2 * self.pad
+            org = (self.pad, self.pad + th)
+            #글자 모양은 alpha 에만 그리고 색은 전체를 단색으로 (안티앨리어싱은 alpha 로 표현)
+            alpha = np.zeros((h, w), dtype=np.uint8)
+            cv2.putText(alpha, text, org, self.font, self.scale, 255, self.thickness, self.line_type)
+            image = np.empty((h, w, 4), dtype=np.uint8)
+            image[:, :, :3] = color
+            image[:, :, 3] = alpha
+            sprite = Sprite(image)
+            self.sprites[key] = (sprite, th)
+        return self.sprites[key]
+
+    #org 에 그릴 때 스프라이트가 차지하는 영역 (x0, y0, x1, y1)
+    def bounds(self, text, org, color):
+        sprite, th = self.get(text, color)
+        x0, y0 = org[0] - self.pad, org[1] - th - self.pad
+        return x0, y0, x0 + sprite.shape[1], y0 + sprite.shape[0]
+
+    #org : putText 와 같은 글자 기준선 왼쪽 좌표, frame 을 직접 수정
+    def draw(self, frame, text, org, color):
+        sprite, th = self.get(text, color)
+        sprite.draw(frame, org[0] - self.pad, org[1] - th - self.pad)
+        return frame
+
+    #premultiplied 레이어에 겹침 (Sprite.draw_layer)
+    def draw_layer(self, premult, inv_alpha, text, org, color):
+        sprite, th = self.get(text, color)
+        sprite.draw_layer(premult, inv_alpha, org[0] - self.pad, org[1] - th - self.pad)
@@ -0,0 +1,64 @@
+#추적 중인 차선으로 물체가 내 차선 / 옆 차선 / 그 밖 중 어디에 있는지 나누는 모듈
+#프레임마다 좌우 차선 다항식을 원본 좌표로 역투영해서 저해상도(cell 픽셀당 한칸) 구역 지도를 한번 그리고
+#물체는 박스 아래 중앙 점으로 지도에서 바로 찾음
+
+
+import cv2 as cv
+import numpy as np
+
+import line_check_frame
+
+ZONE_OUTSIDE = 0
+ZONE_EGO = 1
+ZONE_ADJACENT = 2
+#차선 정보가 없거나 추적 중인 차선보다 멀리 있어서 판단할 수 없음
+ZONE_UNKNOWN = 3
+
+
+#구역 지도
+#frame_size : (w, h), cell : 지도 한칸의 크기(픽셀), num_points : 차선 곡선을 나눌 점 개수
+class LaneZoneMask:
+    def __init__(self, frame_size, cell=8, num_points=24):
+        self.frame_size = tuple(frame_size)
+        self.cell = cell
+        self.num_points = num_points
+        w, h = self.frame_size
+        self.mask = np.full((-(-h // cell), -(-w // cell)), ZONE_UNKNOWN, dtype=np.uint8)
+        self.valid = False
+
+    #lane : LaneTracker.last_lane, Minv : 역 원근변환 행렬 또는 geometry.RemapWarp
+    def update(self, lane, Minv):
+        if lane is None or lane["left_fit"] is None or lane["right_fit"] is None:
+            self.valid = False
+            return self
+        n = self.num_points
+        ploty = np.linspace(0, lane["warped_shape"][0] - 1, n)
+        left = np.polyval(lane["left_fit"], ploty)
+        right = np.polyval(lane["right_fit"], ploty)
+        width = right - left
+        #옆 차선 바깥 경계, 왼쪽 차선, 오른쪽 차선, 옆 차선 바깥 경계 4개 곡선을 한번에 역투영
+        pts = np.empty((4, n, 2), dtype=np.float32)
+        for i, xs in enumerate((left - width, left, right, right + width)):
+            pts[i, :, 0] = xs
+            pts[i, :, 1] = ploty
+        curves = line_check_frame.back_project_points(pts.reshape(-1, 1, 2), Minv).reshape(4, n, 2)
+        curves = np.int32(np.round(curves / self.cell))
+        outer_left, left_curve, right_curve, outer_right = curves
+
+        #추적 중인 차선의 가장 먼 곳보다 위는 판단 불가, 아래는 일단 바깥으로 채우고 차선 영역을 덮어 그림
+        top = int(np.clip(curves[:, :, 1].min(), 0, self.mask.shape[0]))
+        self.mask[:top] = ZONE_UNKNOWN
+        self.mask[top:] = ZONE_OUTSIDE
+        cv.fillPoly(self.mask, [np.vstack((outer_left, np.flipud(left_curve))),
+                                np.vstack((right_curve, np.flipud(outer_right)))], ZONE_ADJACENT)
+        cv.fillPoly(self.mask, [np.vstack((left_curve, np.flipud(right_curve)))], ZONE_EGO)
+        self.valid = True
+        return self
+
+    #x, y : 원본 좌표 배열, 반환 : 구역 번호 배열 (uint8)
+    def classify(self, x, y):
+        if not self.valid:
+            return np.full(len(x), ZONE_UNKNOWN, dtype=np.uint8)
+        ix = np.clip((np.asarray(x) / self.cell).astype(np.int32), 0, self.mask.shape[1] - 1)
+        iy = np.clip((np.asarray(y) / self.cell).astype(np.int32), 0, self.mask.shape[0] - 1)
+        return self.mask[iy, ix]
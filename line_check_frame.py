@@ -8,6 +8,8 @@ import numpy as np
 import time
 import warnings
 import matplotlib.pyplot as plt
+import perspective_calibration
+from label_atlas import TextSpriteCache
 # Dont show warnings
 warnings.filterwarnings("ignore")
 
@@ -15,6 +17,40 @@ src = np.array([[598, 448], [684, 448], [1026, 668], [278, 668]], np.float32)
 dst = np.array([[300, 0], [980, 0], [980, 720], [300, 720]], np.float32)
 
 kernel_small = np.array([[0, 1, 0], [1, 1, 1], [0, 1, 0]], 'uint8')
+
+#차선 라벨 글자는 종류가 몇개 안되므로 시작할 때 스프라이트로 미리 만들어 둠
+lane_label_sprites = TextSpriteCache()
+lane_label_sprites.preload([f"Left: {t}" for t in ("solid", "dashed", "unknown")], (0, 255, 0))
+lane_label_sprites.preload([f"Right: {t}" for t in ("solid", "dashed", "unknown")], (255, 0, 0))
+
+#프레임 한장에 대한 색공간 변환 캐시
+#같은 프레임에서 HLS, HSV, gray 변환을 여러 전처리가 나눠 쓰도록 한번만 계산
+#frame : 원본 BGR 이미지
+class FrameContext:
+    def __init__(self, frame):
+        self.frame = frame
+        self._cache = {}
+
+    #code : cv.COLOR_BGR2* 변환 코드
+    def convert(self, code):
+        converted = self._cache.get(code)
+        if converted is None:
+            converted = cv.cvtColor(self.frame, code)
+            self._cache[code] = converted
+        return converted
+
+    @property
+    def hls(self):
+        return self.convert(cv.COLOR_BGR2HLS)
+
+    @property
+    def hsv(self):
+        return self.convert(cv.COLOR_BGR2HSV)
+
+    @property
+    def gray(self):
+        return self.convert(cv.COLOR_BGR2GRAY)
+
 # Convert image to yellow and white color space
 #hsv를 통해 흰색과 노란색만 남기기
 def color_space(img):
@@ -31,9 +67,12 @@ def color_space(img):
     return cv.cvtColor(cv.bitwise_and(img, img, mask=masks), cv.COLOR_BGR2GRAY)
 
 #hls를 통해 흰색과 노란색만 남기기
-def color_space_hls(img):
+#ctx : FrameContext, 다른 전처리와 색공간 변환을 공유할 때 넘김
+def color_space_hls(img, ctx=None):
+    if ctx is None:
+        ctx = FrameContext(img)
     # Convert image to HSV
-    img_hls = cv.cvtColor(img, cv.COLOR_BGR2HLS)
+    img_hls = ctx.hls
     # Colorspace "yellow" in HSV: (15-40, 80-255, 160-255)
     mask_yellow = cv.inRange(img_hls, (15, 100, 0), (25, 150, 255))
     # Colorspace "white" in HSV: (0-255, 0-20, 200-255)
@@ -42,7 +81,7 @@ def color_space_hls(img):
 
 
 
-    hsv = cv.cvtColor(img, cv.COLOR_BGR2HSV)
+    hsv = ctx.hsv
 
     # 초록색 제거용 마스크 (선택 사항)
     lower_green = np.array([35, 50, 50])
@@ -61,17 +100,92 @@ def color_space_hls(img):
 
     #cv.imshow('hls', cv.cvtColor(cv.bitwise_and(img, img, mask=masks), cv.COLOR_HLS2BGR))
     #cv.imshow('hls', cv.bitwise_and(img, img, mask=masks))
-    
-    return cv.cvtColor(cv.bitwise_and(img, img, mask=masks), cv.COLOR_BGR2GRAY)
+
+    #마스크 후 흑백 변환한 것과 흑백에 마스크 한 것은 같으므로 캐시된 gray 사용
+    gray = ctx.gray
+    return cv.bitwise_and(gray, gray, mask=masks)
 
 
 import numpy as np
 import cv2
 
+#차선 추적 경로별 통계 클래스
+#경로(quick, central, fallback)별 호출 횟수와 소요 시간 히스토그램, 리셋 횟수를 기록
+#bounds_ms : 히스토그램 구간 경계값(ms), 마지막 구간은 그 이상 전부
+#paths : 기록할 경로 이름들
+class TrackerStats:
+    PATHS = ("quick", "central", "fallback")
+
+    def __init__(self, bounds_ms=(1, 2, 5, 10, 20, 50, 100), paths=PATHS):
+        self.bounds_ms = tuple(bounds_ms)
+        self.path_names = tuple(paths)
+        self.clear()
+
+    def clear(self):
+        self.frames = 0
+        #진입시 should_reset 이 True 였던 횟수
+        self.reset_checks = 0
+        #결과가 나빠서 fit 을 None 으로 만들고 reset_F 를 세운 횟수
+        self.result_resets = 0
+        self.paths = {
+            name: {"count": 0, "total_ms": 0.0, "max_ms": 0.0,
+                   "hist": [0] * (len(self.bounds_ms) + 1)}
+            for name in self.path_names
+        }
+
+    #한 프레임의 결과 기록
+    #path : 사용된 탐색 경로, elapsed_ms : update 전체 소요 시간
+    def record(self, path, elapsed_ms, reset_check, result_reset):
+        self.frames += 1
+        if reset_check:
+            self.reset_checks += 1
+        if result_reset:
+            self.result_resets += 1
+        entry = self.paths[path]
+        entry["count"] += 1
+        entry["total_ms"] += elapsed_ms
+        entry["max_ms"] = max(entry["max_ms"], elapsed_ms)
+        bucket = len(self.bounds_ms)
+        for i, bound in enumerate(self.bounds_ms):
+            if elapsed_ms < bound:
+                bucket = i
+                break
+        entry["hist"][bucket] += 1
+
+    #조회용 스냅샷 (원본을 건드리지 않도록 복사해서 반환)
+    def snapshot(self):
+        paths = {}
+        for name, entry in self.paths.items():
+            count = entry["count"]
+            paths[name] = {
+                "count": count,
+                "ratio": count / self.frames if self.frames else 0.0,
+                "mean_ms": entry["total_ms"] / count if count else 0.0,
+                "max_ms": entry["max_ms"],
+                "hist": list(entry["hist"]),
+            }
+        return {
+            "frames": self.frames,
+            "reset_checks": self.reset_checks,
+            "result_resets": self.result_resets,
+            "bounds_ms": self.bounds_ms,
+            "paths": paths,
+        }
+
+    def summary(self):
+        parts = [f"frames={self.frames}", f"reset_checks={self.reset_checks}",
+                 f"result_resets={self.result_resets}"]
+        for name, entry in self.snapshot()["paths"].items():
+            parts.append(f"{name}={entry['count']}({entry['ratio'] * 100:.0f}%, "
+                         f"avg {entry['mean_ms']:.1f}ms, max {entry['max_ms']:.1f}ms)")
+        return " ".join(parts)
+
+
 #차선 감지용 클래스
 class LaneTracker:
     #nwindows : 슬라이딩 윈도우의 갯수, margin : 탐지할때의 마진 값, minimum : 탐지할때의 최솟값
-    def __init__(self, nwindows=9, margin=200, minimum=30):
+    #log_interval : 몇 프레임마다 경로 통계를 출력할지 (0 이면 출력 안함)
+    def __init__(self, nwindows=9, margin=200, minimum=30, log_interval=300):
         self.prev_left_fit = None
         self.prev_right_fit = None
         self.nwindows = nwindows
@@ -79,6 +193,21 @@ class LaneTracker:
         self.minimum = minimum
         self.dummy = None
         self.reset_F = False
+        self.log_interval = log_interval
+        self.stats = TrackerStats()
+        #마지막 update 에서 사용된 탐색 경로
+        self.last_path = None
+        #차선 표시 레이어 캐시 (track_lane 에서 사용)
+        self.overlay_cache = LaneOverlayCache()
+        #마지막 track_lane 결과 (다항식, 선 종류 등 그리기에 필요한 값)
+        self.last_lane = None
+
+    #경로별 통계 조회
+    def get_stats(self):
+        return self.stats.snapshot()
+
+    def reset_stats(self):
+        self.stats.clear()
         
 
     def reset(self):
@@ -150,9 +279,11 @@ class LaneTracker:
     #warped_img 2진 이미지를 넣으면 그것을 바탕으로 차선을 탐지
     #draw 가 True 라면 슬라이딩 윈도우 시각화 됨
     def update(self, warped_img, draw=False):
+        start_time = time.perf_counter()
 
         #차선 데이터 상태 확인해서 안좋으면 차선 데이터 리셋 
-        if self.should_reset(self.prev_left_fit, self.prev_right_fit, warped_img):
+        reset_check = bool(self.should_reset(self.prev_left_fit, self.prev_right_fit, warped_img))
+        if reset_check:
             #result = self.sliding_windows_visual(warped_img, draw)
             """
             if self.dummy is not None:
@@ -160,11 +291,14 @@ class LaneTracker:
                 plt.show()
             """
             #차선 데이터 없을때 차선 탐지
+            #중앙 기준 탐색이 실패하면 내부에서 last_path 를 fallback 으로 바꿈
+            self.last_path = "central"
             result = self.sliding_windows_visual_central(warped_img, draw)
         else:
             #이전 차선 데이터를 바탕으로 차선 탐지
             #이전 차선 데이터를 바탕으로 차선을 탐지하다보니 한번 뒤틀리면 계속 뒤틀림
             #그래서 결과값을 확인하고 결과값 리셋을 해줌
+            self.last_path = "quick"
             result = self.quick_search(warped_img, draw)
 
         #나온 결과값을 바탕으로 상태 안좋으면 결과값 리셋
@@ -178,6 +312,11 @@ class LaneTracker:
         self.prev_left_fit = result["left"]["fit"]
         self.prev_right_fit = result["right"]["fit"]
         self.dummy = result["image"]
+
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+        self.stats.record(self.last_path, elapsed_ms, reset_check, self.reset_F)
+        if self.log_interval and self.stats.frames % self.log_interval == 0:
+            print("[LaneTracker]", self.stats.summary())
         return result
     #sliding window
     #평범한 sliding_window 방식
@@ -486,9 +625,11 @@ class LaneTracker:
                 for i in range(len(ploty)-1):
                     cv.line(out_img, (int(right_fitx[i]), int(ploty[i])), (int(right_fitx[i+1]), int(ploty[i+1])), (0, 255, 255), 2)
         if left_fit is None or right_fit is None:
+            self.last_path = "fallback"
             return self.sliding_windows_visual(warped_img_ori, draw)
         else:
             if np.any(left_fitx >= right_fitx):
+                self.last_path = "fallback"
                 return self.sliding_windows_visual(warped_img_ori, draw)
         return {
             "image": out_img,
@@ -567,12 +708,288 @@ class LaneTracker:
         }
 
 
+#고정된 가로줄 몇 개만 샘플링해서 차선을 찾는 저비용 차선 탐지 클래스
+#전체 이미지 nonzero() 대신 rows 개의 줄에서 np.diff 로 흰색 구간(run)을 찾고 그 중심으로 다항식을 구함
+#비용이 이미지 크기가 아니라 샘플링하는 줄 수에 비례
+#rows : 샘플링할 줄 수, min_width / max_width : 차선으로 인정할 run 의 폭(px), min_points : 다항식을 구하기 위한 최소 점 수
+class ScanlineLaneTracker(LaneTracker):
+    def __init__(self, rows=24, margin=50, min_width=2, max_width=80, min_points=6, log_interval=300):
+        super().__init__(nwindows=rows, margin=margin, minimum=min_points, log_interval=log_interval)
+        self.rows = rows
+        self.min_width = min_width
+        self.max_width = max_width
+        self.min_points = min_points
+        self.stats = TrackerStats(paths=("scanline",))
+        self.last_path = "scanline"
+        self._row_cache = None
+
+    #이미지 높이에 맞는 샘플링 줄 위치 (아래 ROI 마스킹과 같이 맨 아래 20px 는 제외)
+    def sample_rows(self, height):
+        if self._row_cache is None or self._row_cache[0] != height:
+            ys = np.linspace(0, height - 21, self.rows).astype(np.intp)
+            self._row_cache = (height, ys)
+        return self._row_cache[1]
+
+    #각 샘플 줄의 흰색 구간 시작/끝을 한번에 구함
+    #반환 : 줄 번호(0 ~ rows-1), 구간 중심 x, 구간 폭
+    def find_runs(self, band):
+        padded = np.zeros((band.shape[0], band.shape[1] + 2), np.int8)
+        padded[:, 1:-1] = band > 0
+        edges = np.diff(padded, axis=1)
+        start_rows, start_cols = np.nonzero(edges == 1)
+        _, end_cols = np.nonzero(edges == -1)
+        widths = end_cols - start_cols
+        centers = (start_cols + end_cols - 1) / 2.0
+        keep = (widths >= self.min_width) & (widths <= self.max_width)
+        return start_rows[keep], centers[keep], widths[keep]
+
+    #한쪽 차선에 해당하는 구간을 줄마다 하나씩 고름, 고른 구간의 인덱스 반환
+    #expected : 줄마다 예상되는 차선 x (이전 다항식), 없으면 중앙에서 가장 가까운 구간
+    def pick_runs(self, run_rows, centers, expected, side, midpoint):
+        picked = []
+        for i in range(self.rows):
+            row_inds = np.nonzero(run_rows == i)[0]
+            if expected is not None:
+                dist = np.abs(centers[row_inds] - expected[i])
+                if len(row_inds) == 0 or dist.min() >= self.margin:
+                    continue
+                picked.append(row_inds[np.argmin(dist)])
+            else:
+                if side == "left":
+                    row_inds = row_inds[centers[row_inds] < midpoint]
+                    if len(row_inds) > 0:
+                        picked.append(row_inds[np.argmax(centers[row_inds])])
+                else:
+                    row_inds = row_inds[centers[row_inds] >= midpoint]
+                    if len(row_inds) > 0:
+                        picked.append(row_inds[np.argmin(centers[row_inds])])
+        return np.array(picked, dtype=np.intp)
+
+    def fit_points(self, x, y, height):
+        if len(x) < self.min_points or np.ptp(y) < height / 3:
+            return None
+        fit = np.polyfit(y, x, 2)
+        x, y = self.remove_outliers(x, y, fit)
+        if len(x) < self.min_points:
+            return None
+        return np.polyfit(y, x, 2)
+
+    def update(self, warped_img, draw=False):
+        start_time = time.perf_counter()
+        height, width = warped_img.shape
+        ys = self.sample_rows(height)
+
+        reset_check = bool(self.should_reset(self.prev_left_fit, self.prev_right_fit, warped_img))
+        run_rows, centers, widths = self.find_runs(warped_img[ys])
+
+        if reset_check:
+            left_expected = right_expected = None
+        else:
+            left_expected = np.polyval(self.prev_left_fit, ys)
+            right_expected = np.polyval(self.prev_right_fit, ys)
+        left_inds = self.pick_runs(run_rows, centers, left_expected, "left", width // 2)
+        right_inds = self.pick_runs(run_rows, centers, right_expected, "right", width // 2)
+        leftx, lefty = centers[left_inds], ys[run_rows[left_inds]]
+        rightx, righty = centers[right_inds], ys[run_rows[right_inds]]
+
+        left_fit = self.fit_points(leftx, lefty, height)
+        right_fit = self.fit_points(rightx, righty, height)
+
+        #점선 판단용으로 찾은 구간만 왼쪽 파랑, 오른쪽 빨강으로 표시
+        out_img = np.zeros((height, width, 3), np.uint8)
+        for inds, color in ((left_inds, (255, 0, 0)), (right_inds, (0, 0, 255))):
+            for x, y, w in zip(centers[inds], ys[run_rows[inds]], widths[inds]):
+                cv.line(out_img, (int(x - w / 2), int(y)), (int(x + w / 2), int(y)), color, 1)
+
+        result = {
+            "image": out_img,
+            "left": {"fit": left_fit, "x": leftx.astype(np.int32), "y": lefty},
+            "right": {"fit": right_fit, "x": rightx.astype(np.int32), "y": righty},
+        }
+        if self.should_reset(left_fit, right_fit, warped_img):
+            self.reset_F = True
+            result["left"]["fit"] = None
+            result["right"]["fit"] = None
+        else:
+            self.reset_F = False
+        self.prev_left_fit = result["left"]["fit"]
+        self.prev_right_fit = result["right"]["fit"]
+        self.dummy = out_img
+
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+        self.stats.record(self.last_path, elapsed_ms, reset_check, self.reset_F)
+        if self.log_interval and self.stats.frames % self.log_interval == 0:
+            print("[ScanlineLaneTracker]", self.stats.summary())
+        return result
+
+
+#직선 구간용 HoughLinesP 기반 차선 탐지 클래스
+#LaneTracker 와 같은 update 결과 형식을 돌려줘서 track_lane 에 그대로 쓸 수 있음
+#차선이 휘기 시작하면(직선과 2차 곡선의 차이가 bend_limit 이상) 내부의 LaneTracker 로 넘기고
+#LaneTracker 결과가 return_frames 프레임 연속으로 곧으면 다시 Hough 로 돌아옴
+#tracker : 곡선 구간에서 쓸 LaneTracker, bend_limit : 곡선 판단 기준(px), return_frames : Hough 로 복귀하기 위한 연속 직선 프레임 수
+class HoughLaneTracker:
+    def __init__(self, tracker, bend_limit=25, return_frames=15,
+                 hough_threshold=30, min_line_length=30, max_line_gap=20):
+        self.tracker = tracker
+        self.bend_limit = bend_limit
+        self.return_frames = return_frames
+        self.hough_threshold = hough_threshold
+        self.min_line_length = min_line_length
+        self.max_line_gap = max_line_gap
+        #현재 모드, "hough" 또는 "tracker"
+        self.mode = "hough"
+        self.straight_count = 0
+        self.handovers = 0
+        self.reset_F = False
+        self.overlay_cache = tracker.overlay_cache
+        self.last_lane = None
+        self.log_interval = tracker.log_interval
+        #Hough 로 처리한 프레임과 LaneTracker 로 넘긴 프레임을 한 통계에 기록 (LaneTracker 도 같은 객체에 기록)
+        #Hough 에서 곡선으로 판단해 넘긴 프레임은 LaneTracker 경로(quick / central / fallback)로 기록됨
+        self.stats = TrackerStats(paths=("hough",) + TrackerStats.PATHS)
+        tracker.stats = self.stats
+
+    def reset(self):
+        self.tracker.reset()
+        self.mode = "hough"
+        self.straight_count = 0
+
+    #통계 조회 (경로별 통계 + Hough 모드 정보)
+    def get_stats(self):
+        stats = self.stats.snapshot()
+        stats["mode"] = self.mode
+        stats["handovers"] = self.handovers
+        return stats
+
+    def reset_stats(self):
+        self.stats.clear()
+        self.handovers = 0
+
+    #다항식이 직선에서 얼마나 휘었는지(px), 이미지 위, 중간, 아래에서의 차이 중 최댓값
+    def bend(self, fit, height):
+        if fit is None:
+            return 0.0
+        ys = np.array([0, height / 2, height - 1])
+        curve = np.polyval(fit, ys)
+        line = np.polyval(np.polyfit(ys, curve, 1), ys)
+        return float(np.max(np.abs(curve - line)))
+
+    #선분들로 한쪽 차선의 직선 다항식(2차 계수는 0)과 2차 다항식을 구함
+    #segments : (N, 4) x1, y1, x2, y2
+    def fit_segments(self, segments):
+        if len(segments) == 0:
+            return None, None, np.empty(0, np.int32), np.empty(0, np.int32)
+        #선분을 따라 일정 간격으로 점을 찍어서 긴 선분일수록 가중치가 크게
+        xs, ys = [], []
+        for x1, y1, x2, y2 in segments:
+            n = max(2, int(abs(y2 - y1) // 10) + 1)
+            xs.append(np.linspace(x1, x2, n))
+            ys.append(np.linspace(y1, y2, n))
+        x = np.concatenate(xs)
+        y = np.concatenate(ys)
+        if np.ptp(y) < 20:
+            return None, None, x.astype(np.int32), y.astype(np.int32)
+        line_fit = np.polyfit(y, x, 1)
+        line_fit = np.array([0.0, line_fit[0], line_fit[1]])
+        #선분 수가 아니라 찍은 점으로 2차 곡선을 구함 (선분 1~2개로도 휜 정도를 잴 수 있게)
+        curve_fit = np.polyfit(y, x, 2) if len(x) >= 3 else line_fit
+        return line_fit, curve_fit, x.astype(np.int32), y.astype(np.int32)
+
+    def hough_search(self, warped_img):
+        height, width = warped_img.shape
+        out_img = cv.merge([warped_img] * 3)
+        lines = cv.HoughLinesP(warped_img, 1, np.pi / 180, self.hough_threshold,
+                               minLineLength=self.min_line_length, maxLineGap=self.max_line_gap)
+        segments = np.empty((0, 4), np.int32) if lines is None else lines.reshape(-1, 4)
+
+        #원근 변환된 이미지에서 차선은 세로에 가까우므로 누운 선분 제거
+        dx = np.abs(segments[:, 2] - segments[:, 0])
+        dy = np.abs(segments[:, 3] - segments[:, 1])
+        segments = segments[dx < dy * 0.5]
+
+        mid_x = (segments[:, 0] + segments[:, 2]) / 2
+        left_segments = segments[mid_x < width // 2]
+        right_segments = segments[mid_x >= width // 2]
+
+        left_fit, left_curve, leftx, lefty = self.fit_segments(left_segments)
+        right_fit, right_curve, rightx, righty = self.fit_segments(right_segments)
+
+        #점선 판단을 위해 선분을 왼쪽 파랑, 오른쪽 빨강으로 표시 (LaneTracker 와 동일한 색)
+        for x1, y1, x2, y2 in left_segments:
+            cv.line(out_img, (int(x1), int(y1)), (int(x2), int(y2)), (255, 0, 0), 3)
+        for x1, y1, x2, y2 in right_segments:
+            cv.line(out_img, (int(x1), int(y1)), (int(x2), int(y2)), (0, 0, 255), 3)
+
+        bend = max(self.bend(left_curve, height), self.bend(right_curve, height))
+        return {
+            "image": out_img,
+            "left": {"fit": left_fit, "x": leftx, "y": lefty},
+            "right": {"fit": right_fit, "x": rightx, "y": righty},
+        }, bend
+
+    #LaneTracker.update 와 같은 형식의 결과 반환
+    #warped_img : Hough 용 에지 이미지, tracker_img : LaneTracker 용 차선 2진 이미지 (또는 그것을 만드는 함수)
+    #tracker_img 가 함수면 LaneTracker 로 넘길 때만 호출해서 직선 구간에서는 계산하지 않음, None 이면 warped_img 사용
+    def update(self, warped_img, draw=False, tracker_img=None):
+        height = warped_img.shape[0]
+        if self.mode == "hough":
+            start_time = time.perf_counter()
+            result, bend = self.hough_search(warped_img)
+            left_fit = result["left"]["fit"]
+            right_fit = result["right"]["fit"]
+            if bend < self.bend_limit and not self.tracker.should_reset(left_fit, right_fit, warped_img):
+                self.reset_F = False
+                elapsed_ms = (time.perf_counter() - start_time) * 1000
+                self.stats.record("hough", elapsed_ms, False, False)
+                if self.log_interval and self.stats.frames % self.log_interval == 0:
+                    print("[HoughLaneTracker]", self.stats.summary())
+                return result
+            #곡선이거나 Hough 결과가 이상하면 LaneTracker 로 넘김
+            #Hough 결과가 쓸만하면 이전 차선으로 넣어서 quick_search 부터 시작
+            self.mode = "tracker"
+            self.handovers += 1
+            self.straight_count = 0
+            self.tracker.prev_left_fit = left_fit
+            self.tracker.prev_right_fit = right_fit
+
+        if callable(tracker_img):
+            tracker_img = tracker_img()
+        result = self.tracker.update(warped_img if tracker_img is None else tracker_img, draw)
+        self.reset_F = self.tracker.reset_F
+        bend = max(self.bend(result["left"]["fit"], height), self.bend(result["right"]["fit"], height))
+        if result["left"]["fit"] is not None and result["right"]["fit"] is not None and bend < self.bend_limit:
+            self.straight_count += 1
+            if self.straight_count >= self.return_frames:
+                self.mode = "hough"
+        else:
+            self.straight_count = 0
+        return result
+
+
 
     # Warp image perspective
 #원근 변환
-#img : 이미지, M : 원근변환을 위한 행렬
-def warp(img, M):
-    return cv.warpPerspective(img, M, (img.shape[1], img.shape[0]), flags=cv.INTER_NEAREST)
+#img : 이미지, M : 원근변환을 위한 행렬 또는 geometry.RemapWarp (왜곡 보정 + 원근 변환 remap 테이블)
+#flags : 보간 방식, border_mode : 영역 밖 처리 방식
+def warp(img, M, flags=cv.INTER_NEAREST, border_mode=cv.BORDER_CONSTANT):
+    if hasattr(M, "warp"):
+        return M.warp(img, flags, border_mode)
+    return cv.warpPerspective(img, M, (img.shape[1], img.shape[0]), flags=flags, borderMode=border_mode)
+
+#원본 좌표 -> 원근 변환 좌표
+#pts : (N, 1, 2) float32, M : 원근변환을 위한 행렬 또는 geometry.RemapWarp
+def transform_points(pts, M):
+    if hasattr(M, "project_points"):
+        return M.project_points(pts)
+    return cv.perspectiveTransform(pts, M)
+
+#원근 변환 좌표 -> 원본 좌표
+#pts : (N, 1, 2) float32, Minv : 역 원근변환을 위한 행렬 또는 geometry.RemapWarp
+def back_project_points(pts, Minv):
+    if hasattr(Minv, "back_project"):
+        return Minv.back_project(pts)
+    return cv.perspectiveTransform(pts, Minv)
 
 #원근변환을 위한 행렬 구하는 함수
 #src : 원본 이미지에서 원근변환을 하고 싶은곳의 좌표값, dst : 원근 변환후의 좌표값
@@ -684,56 +1101,161 @@ def blend_transparent_overlay(base_img, overlay_mask, color=(0, 255, 255), alpha
     blended = cv.addWeighted(base_img, 1, cv.bitwise_and(overlay, mask_3ch), alpha, 0)
     return blended
 
+#다각형 내부만 투명도를 적용해 채우는 함수 (base_img 를 직접 수정)
+#전체 이미지 크기의 마스크/오버레이를 만들지 않고 다각형의 bounding box 안에서만 처리
+#결과는 blend_transparent_overlay 와 같음 (원본 + alpha * color, 255 에서 포화)
+#base_img : 원본 BGR 이미지, polygon : (N, 1, 2) int32 다각형 좌표, color : 덧씌울 색상 (BGR), alpha : 투명도
+def blend_polygon_in_place(base_img, polygon, color=(0, 255, 255), alpha=0.4):
+    x, y, w, h = cv.boundingRect(polygon)
+    x0, y0 = max(x, 0), max(y, 0)
+    x1, y1 = min(x + w, base_img.shape[1]), min(y + h, base_img.shape[0])
+    if x0 >= x1 or y0 >= y1:
+        return base_img
+    roi = base_img[y0:y1, x0:x1]
+    mask = np.zeros(roi.shape[:2], dtype=np.uint8)
+    cv.fillPoly(mask, [polygon - np.int32([x0, y0])], 255)
+    cv.add(roi, tuple(round(c * alpha) for c in color) + (0,), dst=roi, mask=mask)
+    return base_img
+
+#차선 표시(채우기, 좌우 선, 라벨 박스)를 한번 그려두고 재사용하는 캐시
+#차선은 프레임마다 조금씩만 움직이므로 역투영된 점이 tolerance(px) 이상 움직이거나
+#선 종류가 바뀔 때만 다시 그리고, 나머지 프레임은 저장된 레이어를 합성만 함
+#tolerance : 다시 그리기 위한 최소 이동 거리(px)
+class LaneOverlayCache:
+    def __init__(self, tolerance=2):
+        self.tolerance = tolerance
+        self.key = None
+        self.left_pts = None
+        self.right_pts = None
+        self.bbox = None
+        #채우기 레이어 (bbox 크기, 다각형 내부만 alpha * color, 나머지는 0)
+        self.fill_layer = None
+        #선, 박스, 글자 레이어 : premultiplied 색 (color * alpha / 255) 과 255 - alpha
+        self.stroke_layer = None
+        self.stroke_inv_alpha = None
+        self.renders = 0
+        self.hits = 0
+
+    def invalidate(self):
+        self.key = None
+
+    #이전에 그린 것과 비교해서 다시 그려야 하는지 확인
+    def is_valid(self, key, left_pts, right_pts):
+        if self.key != key:
+            return False
+        return (np.abs(left_pts - self.left_pts).max() <= self.tolerance and
+                np.abs(right_pts - self.right_pts).max() <= self.tolerance)
+
+    def render(self, img_shape, left_pts, right_pts, labels, left_color, right_color, fill_color, alpha):
+        lane_poly = np.vstack((left_pts, np.flipud(right_pts)))
+
+        #선 두께와 라벨 글자까지 포함하는 영역
+        x0, y0 = lane_poly.min(axis=(0, 1)) - 3
+        x1, y1 = lane_poly.max(axis=(0, 1)) + 4
+        boxes = []
+        for pts, color, label in ((left_pts, left_color, labels[0]), (right_pts, right_color, labels[1])):
+            box_min = pts.min(axis=(0, 1))
+            box_max = pts.max(axis=(0, 1))
+            org = (int(box_min[0]), int(box_min[1]) - 10)
+            lx0, ly0, lx1, ly1 = lane_label_sprites.bounds(label, org, color)
+            x0, y0, x1 = min(x0, lx0), min(y0, ly0), max(x1, lx1)
+            boxes.append((box_min, box_max, color, label, org))
+        x0, y0 = max(int(x0), 0), max(int(y0), 0)
+        x1, y1 = min(int(x1), img_shape[1]), min(int(y1), img_shape[0])
+        if x0 >= x1 or y0 >= y1:
+            self.bbox = None
+            return
+        offset = np.int32([x0, y0])
+        size = (y1 - y0, x1 - x0)
+
+        fill_mask = np.zeros(size, dtype=np.uint8)
+        cv.fillPoly(fill_mask, [lane_poly - offset], 255)
+        self.fill_layer = np.zeros(size + (3,), dtype=np.uint8)
+        self.fill_layer[fill_mask > 0] = [round(c * alpha) for c in fill_color]
+
+        #선과 박스는 불투명하게 그리고 (선이 있는 곳은 alpha 255)
+        #라벨은 미리 만든 안티앨리어싱 글자 스프라이트를 레이어 위에 겹침
+        self.stroke_layer = np.zeros(size + (3,), dtype=np.uint8)
+        stroke_mask = np.zeros(size, dtype=np.uint8)
+        for layer, value in ((self.stroke_layer, None), (stroke_mask, 255)):
+            cv.polylines(layer, [left_pts - offset], False, value or left_color, 3)
+            cv.polylines(layer, [right_pts - offset], False, value or right_color, 3)
+            for box_min, box_max, color, label, org in boxes:
+                p1 = tuple(int(v) for v in box_min - offset)
+                p2 = tuple(int(v) for v in box_max - offset)
+                cv.rectangle(layer, p1, p2, value or color, 2)
+        self.stroke_inv_alpha = cv.merge([cv.bitwise_not(stroke_mask)] * 3)
+        for box_min, box_max, color, label, org in boxes:
+            lane_label_sprites.draw_layer(self.stroke_layer, self.stroke_inv_alpha, label,
+                                          (org[0] - x0, org[1] - y0), color)
+        self.bbox = (x0, y0, x1, y1)
+
+    #original_img 에 차선 표시를 합성 (직접 수정)
+    def draw(self, original_img, left_pts, right_pts, labels,
+             left_color, right_color, fill_color, alpha=0.4):
+        key = (original_img.shape, labels, left_color, right_color, fill_color, alpha)
+        if self.is_valid(key, left_pts, right_pts):
+            self.hits += 1
+        else:
+            self.render(original_img.shape, left_pts, right_pts, labels, left_color, right_color, fill_color, alpha)
+            self.key = key
+            self.left_pts = left_pts
+            self.right_pts = right_pts
+            self.renders += 1
+        if self.bbox is None:
+            return original_img
+        x0, y0, x1, y1 = self.bbox
+        roi = original_img[y0:y1, x0:x1]
+        cv.add(roi, self.fill_layer, dst=roi)
+        #roi * (255 - alpha) / 255 + premultiplied 색
+        cv.multiply(roi, self.stroke_inv_alpha, dst=roi, scale=1 / 255.0)
+        cv.add(roi, self.stroke_layer, dst=roi)
+        return original_img
+
 #원근 변환이 된 이미지에서 진행된 차선 추적 결과값을 원본 이미지에 올리는 함수
+#original_img 에 직접 그림 (호출하는 쪽에서 원본이 필요하면 복사해서 넘길 것)
 #original_img : 원본 이미지, left_fit : 왼쪽 차선의 다항식, right_fit : 오른쪽 차선의 다항식, warped_shape : 원근 변환된 이미지의 shape,
 #Minv : 역 원근변환을 위한 변환 행렬, left_type : 왼쪽 차선의 타입, right_type : 오른쪽 차선의 타입
 #left_color : 왼쪽 차선의 결과 표시 색, right_color : 오른쪽 차선의 결과 표시 색, fill_color : 차선 사이 표시 색
+#num_points : 곡선마다 샘플링할 점 개수, overlay_cache : LaneOverlayCache (있으면 캐시된 레이어를 합성)
 def draw_lane_area_with_labels(original_img, left_fit, right_fit, warped_shape, Minv,
                                left_type="unknown", right_type="unknown",
-                               left_color=(0, 255, 0), right_color=(255, 0, 0), fill_color=(0, 255, 255)):
-
-    ploty = np.linspace(0, warped_shape[0] - 1, warped_shape[0])
+                               left_color=(0, 255, 0), right_color=(255, 0, 0), fill_color=(0, 255, 255),
+                               num_points=36, overlay_cache=None):
 
     if left_fit is None or right_fit is None:
         return original_img  # early exit
-    
-    left_fitx = np.polyval(left_fit, ploty)
-    left_pts = np.array([[left_fitx[i], ploty[i]] for i in range(len(ploty))], dtype=np.float32).reshape(-1, 1, 2)
-    left_unwarped = cv.perspectiveTransform(left_pts, Minv)
 
-    right_fitx = np.polyval(right_fit, ploty)
-    right_pts = np.array([[right_fitx[i], ploty[i]] for i in range(len(ploty))], dtype=np.float32).reshape(-1, 1, 2)
-    right_unwarped = cv.perspectiveTransform(right_pts, Minv)
-    # 역투영
-    
-    
+    #곡선은 몇십개 점이면 충분해서 높이만큼 다 계산하지 않음
+    ploty = np.linspace(0, warped_shape[0] - 1, num_points)
 
-    # 차선 영역 그리기
+    # 역투영
+    left_pts = np.stack([np.polyval(left_fit, ploty), ploty], axis=1).astype(np.float32).reshape(-1, 1, 2)
+    left_unwarped = np.int32(back_project_points(left_pts, Minv))
 
-    
+    right_pts = np.stack([np.polyval(right_fit, ploty), ploty], axis=1).astype(np.float32).reshape(-1, 1, 2)
+    right_unwarped = np.int32(back_project_points(right_pts, Minv))
 
-    result = original_img.copy()
+    if overlay_cache is not None:
+        return overlay_cache.draw(original_img, left_unwarped, right_unwarped,
+                                  (f"Left: {left_type}", f"Right: {right_type}"),
+                                  left_color, right_color, fill_color)
 
+    # 차선 영역 그리기
+    result = original_img
     lane_poly = np.vstack((left_unwarped, np.flipud(right_unwarped)))
-#cv.fillPoly(result, [np.int32(lane_poly)], fill_color)
-
-    lane_mask = np.zeros(original_img.shape[:2], dtype=np.uint8)
-    cv.fillPoly(lane_mask, [np.int32(lane_poly)], 255)
-    result = blend_transparent_overlay(original_img, lane_mask, color=fill_color, alpha=0.4)
+    blend_polygon_in_place(result, lane_poly, color=fill_color, alpha=0.4)
 
     # 좌우 선 그리기
-    cv.polylines(result, [np.int32(left_unwarped)], False, left_color, 3)
-    cv.polylines(result, [np.int32(right_unwarped)], False, right_color, 3)
-    
+    cv.polylines(result, [left_unwarped], False, left_color, 3)
+    cv.polylines(result, [right_unwarped], False, right_color, 3)
+
 # 박스 그리기: 좌우 차선 경계 사각형
     def draw_label_box(unwarped_pts, color, label):
-        xs = [pt[0][0] for pt in unwarped_pts]
-        ys = [pt[0][1] for pt in unwarped_pts]
-        x_min, x_max = int(min(xs)), int(max(xs))
-        y_min, y_max = int(min(ys)), int(max(ys))
-        cv.rectangle(result, (x_min, y_min), (x_max, y_max), color, 2)
-        cv.putText(result, label, (x_min, y_min - 10),
-                    cv.FONT_HERSHEY_SIMPLEX, 0.8, color, 2, cv.LINE_AA)
+        x_min, y_min = unwarped_pts.min(axis=(0, 1))
+        x_max, y_max = unwarped_pts.max(axis=(0, 1))
+        cv.rectangle(result, (int(x_min), int(y_min)), (int(x_max), int(y_max)), color, 2)
+        lane_label_sprites.draw(result, label, (int(x_min), int(y_min) - 10), color)
 
 # 박스 + 라벨 추가
     draw_label_box(left_unwarped, left_color, f"Left: {left_type}")
@@ -786,35 +1308,15 @@ def get_region_brightness(image, x_ratio=0.5, y_ratio=0.6, region_size=0.2):
     brightness = np.mean(region)
     return brightness
 
-# 호출
-#color 방식으로 차선 탐지
-#전처리 과정이 color 방식으로 다를 뿐 그 이후는 같음
-#frame : 이미지, M : 원근변환을 위한 행렬, Minv : 역 원근변환을 위한 행렬, LT : 차선감지 클래스
-def line_check(frame, M, Minv, LT):
-    orig = frame.copy()
-    """
-    img_clahe = hls_clahe(orig)
-
-    color = color_space_hls(img_clahe)
-    brightness = get_region_brightness(img_clahe)
-    """
-
-    #hls 값을 통해 흰색과 노란색 계통만 남기고 흑백화
-    color = color_space_hls(orig)
-
-    #원본 이미지의 밝기 평균값 확인
-    brightness = get_region_brightness(orig)
-    #해당 밝기 평균값을 바탕으로 80 ~ 240 사이의 threshold 값 구하기
-    threshold_val = int(np.clip(brightness * 1.2, 80, 240))
-    #해당 threshold를 바탕으로 흑백 이미지에서 2진 이미지로 변경
-    _, binary_result = cv.threshold(color, threshold_val, 255, cv.THRESH_BINARY)
-
-
-    #return cv.bitwise_and(binary_result, binary_result, mask=shadow_mask)
-
-    #여기서 부터는 동일
+#전처리된 2진 이미지로 차선을 추적하고 결과를 원본에 표시하는 공통 과정
+#line_check, line_check_sobel, line_check_hybrid 가 전처리만 다르고 이후는 같아서 분리
+#orig : 원본 이미지, binary_result : 전처리된 2진 이미지, M, Minv : 원근/역 원근변환 행렬, LT : 차선감지 클래스
+#warped : binary_result 가 이미 원근변환된 이미지면 True
+#render : False 면 원본에 그리지 않고 결과만 LT.last_lane 에 저장 (그리기는 호출하는 쪽에서 나중에)
+#tracker_img : HoughLaneTracker 에만 넘기는 LaneTracker 용 2진 이미지 (HoughLaneTracker.update 참고)
+def track_lane(orig, binary_result, M, Minv, LT, warped=False, render=True, tracker_img=None):
     #차선 판단을 수월하게 하기 위한 원근변환
-    color = warp(binary_result, M)
+    color = binary_result if warped else warp(binary_result, M)
 
 
 
@@ -824,7 +1326,7 @@ def line_check(frame, M, Minv, LT):
     
     #result = central_sliding_windows_based_on_existing(color, nwindows= 5, minimum =100, draw=True)
     #전처리 후 차선 감지
-    result = LT.update(color)
+    result = LT.update(color) if tracker_img is None else LT.update(color, tracker_img=tracker_img)
     
     
     #여기서부터는 감지된 차선을 바탕으로 차선의 종류(실선, 점선) 판단
@@ -862,27 +1364,67 @@ def line_check(frame, M, Minv, LT):
     else:
         right_line_type = "unknown"
         
+    #그리기에 필요한 값은 LT 에 남겨둠 (render=False 일 때 나중에 그리기 위해)
+    LT.last_lane = {
+        "left_fit": result["left"]["fit"],
+        "right_fit": result["right"]["fit"],
+        "warped_shape": color.shape,
+        "left_type": left_line_type,
+        "right_type": right_line_type,
+    }
+    if not render:
+        return orig
+
     #결과를 원본 이미지에 표시하기
     #원근 변환된 이미지를 원본에 맞춰서 역 원근변환 
     result = draw_lane_area_with_labels(
         #original_img=cv.cvtColor(orig, cv.COLOR_BGR2RGB),
         original_img=orig,
-        left_fit=result["left"]["fit"],
-        right_fit=result["right"]["fit"],
-        warped_shape=color.shape,
         Minv=Minv,
         left_color=(0, 255, 0),     # 초록
         right_color=(255, 0, 0),    # 파랑
         fill_color=(0, 255, 255),    # 차선 사이 채우기 (노랑)
-        left_type=left_line_type,
-        right_type=right_line_type
+        overlay_cache=getattr(LT, "overlay_cache", None),
+        **LT.last_lane
     )
     return result
 
+# 호출
+#color 방식으로 차선 탐지
+#전처리 과정이 color 방식으로 다를 뿐 그 이후는 같음
+#frame : 이미지, M : 원근변환을 위한 행렬, Minv : 역 원근변환을 위한 행렬, LT : 차선감지 클래스
+def line_check(frame, M, Minv, LT, render=True):
+    #그리지 않을 때는 frame 을 수정하지 않으므로 복사할 필요 없음
+    orig = frame.copy() if render else frame
+    """
+    img_clahe = hls_clahe(orig)
+
+    color = color_space_hls(img_clahe)
+    brightness = get_region_brightness(img_clahe)
+    """
+
+    #hls 값을 통해 흰색과 노란색 계통만 남기고 흑백화
+    color = color_space_hls(orig)
+
+    #원본 이미지의 밝기 평균값 확인
+    brightness = get_region_brightness(orig)
+    #해당 밝기 평균값을 바탕으로 80 ~ 240 사이의 threshold 값 구하기
+    threshold_val = int(np.clip(brightness * 1.2, 80, 240))
+    #해당 threshold를 바탕으로 흑백 이미지에서 2진 이미지로 변경
+    _, binary_result = cv.threshold(color, threshold_val, 255, cv.THRESH_BINARY)
+
+
+    #return cv.bitwise_and(binary_result, binary_result, mask=shadow_mask)
+
+    #여기서 부터는 동일
+    return track_lane(orig, binary_result, M, Minv, LT, render=render)
+
 #소벨 에지를 통해 2진 데이터를 내보내는 함수
-#img : 원본 이미지
-def combined_threshold(img):
-    gray = cv.cvtColor(img, cv.COLOR_BGR2GRAY)
+#img : 원본 이미지, ctx : FrameContext, 다른 전처리와 색공간 변환을 공유할 때 넘김
+def combined_threshold(img, ctx=None):
+    if ctx is None:
+        ctx = FrameContext(img)
+    gray = ctx.gray
     # 소벨 에지 검출
     #밝기 값이 급격히 변하는 영역을 감지 -> 윤곽선이 감지가 됨
     sobelx = cv.Sobel(gray, cv.CV_64F, 1, 0, ksize=3)
@@ -904,7 +1446,7 @@ def combined_threshold(img):
     """
     # 색상 임계값
     #외곽만 하면 안되는 경우 있어서 어느정도 색상도 약하게 마스킹을 해서 추출
-    hls = cv.cvtColor(img, cv.COLOR_BGR2HLS)
+    hls = ctx.hls
     s_channel = hls[:, :, 2]
     s_thresh_min = 100
     s_thresh_max = 150
@@ -926,8 +1468,8 @@ def open_img(img, iterations):
 # 최초호출 
 #soble 방식으로 차선 탐지
 #전처리 과정이 soble 방식으로 다를 뿐 그 이후는 같음
-def line_check_sobel(frame, M, Minv, LT):
-    orig = frame.copy()
+def line_check_sobel(frame, M, Minv, LT, render=True):
+    orig = frame.copy() if render else frame
 
     
     """
@@ -943,59 +1485,50 @@ def line_check_sobel(frame, M, Minv, LT):
     binary_result = open_img(sobel_test, 1)
 
     #여기서부터는 동일 line_check 에 주석 하겠음
-    color = warp(binary_result, M)
-
-
+    return track_lane(orig, binary_result, M, Minv, LT, render=render)
+
+#색상 방식과 소벨 방식을 합친 차선 탐지
+#두 방식이 쓰는 색공간 변환(HLS, HSV, gray)을 FrameContext 로 한번씩만 계산하고
+#색상 마스크와 에지 마스크를 OR 로 합쳐서 한쪽이 놓친 차선을 다른 쪽이 보완
+def line_check_hybrid(frame, M, Minv, LT, render=True):
+    orig = frame.copy() if render else frame
+    ctx = FrameContext(orig)
+    return track_lane(orig, hybrid_binary(orig, ctx), M, Minv, LT, render=render)
+
+#색상 마스크와 에지 마스크를 OR 로 합친 2진 이미지 (line_check_hybrid, line_check_hough 의 곡선 구간에서 사용)
+def hybrid_binary(orig, ctx):
+    #색상 마스크 (line_check 와 동일한 밝기 기반 threshold)
+    color = color_space_hls(orig, ctx)
+    brightness = get_region_brightness(orig)
+    threshold_val = int(np.clip(brightness * 1.2, 80, 240))
+    _, color_binary = cv.threshold(color, threshold_val, 255, cv.THRESH_BINARY)
 
-    # Step 3: Sliding windows to get curve points    
-    #midpoint, lefts, rights = sliding_windows(color)
-    
-    result = LT.update(color)
+    #에지 마스크 (line_check_sobel 과 동일)
+    gradient_binary = open_img(combined_threshold(orig, ctx), 1)
 
-    
-    lower_red = np.array([0, 0, 200])
-    upper_red = np.array([50, 50, 255])
-    #mask_red = cv.inRange(result["image"], lower_red, upper_red)
+    return cv.bitwise_or(color_binary, gradient_binary)
 
-    # 파란색 마스크
-    lower_blue = np.array([200, 0, 0])
-    upper_blue = np.array([255, 50, 50])
-    #mask_blue = cv.inRange(result["image"], lower_blue, upper_blue)
 
-    # 두 마스크 합치기
-    
-    mask_combined = cv.inRange(result["image"], lower_red, upper_red)
-    mask_combined |= cv.inRange(result["image"], lower_blue, upper_blue)
+#직선 구간용 Hough 방식 차선 탐지
+#흑백 이미지를 원근변환 후 Canny 에지를 구해서 HoughLaneTracker 로 탐지
+#LT : HoughLaneTracker
+#Canny 에지는 Hough 직선 검출에만 쓰고, 곡선 구간의 내부 LaneTracker 에는 line_check_hybrid 와 같은
+#색상 + 소벨 2진 이미지를 넘김 (에지 이미지는 차선 양쪽 경계와 노면 무늬가 모두 남아 슬라이딩 윈도우가 흔들림)
+def line_check_hough(frame, M, Minv, LT, render=True):
+    orig = frame.copy() if render else frame
+    ctx = FrameContext(orig)
 
+    #원본에서 에지를 구하면 원근변환시 먼 곳의 에지가 늘어나 끊어지므로 변환 후 에지 검출
+    #영역 밖을 0 으로 채우면 경계에 가짜 에지가 생겨서 가장자리 값을 복제
+    warped_gray = warp(ctx.gray, M, cv.INTER_LINEAR, cv.BORDER_REPLICATE)
+    warped_gray = cv.GaussianBlur(warped_gray, (5, 5), 0)
+    edges = cv.Canny(warped_gray, 50, 150)
 
-    ploty = np.linspace(0, result["image"].shape[0] - 1, num=result["image"].shape[0])
-    if result["left"]["fit"] is not None:
-        left_line_type = detect_dash_line_along_curve(mask_combined, result["left"]["fit"], ploty)
-        #left_lane_img = draw_lane_curve(mask_combined, result["left"]["fit"], ploty, left_line_type)
-    else:
-        left_line_type = "unknown"
-
-    
-    if result["right"]["fit"] is not None:
-        right_line_type = detect_dash_line_along_curve(mask_combined, result["right"]["fit"], ploty)
-        #right_lane_img = draw_lane_curve(mask_combined, result["right"]["fit"], ploty, right_line_type)
-    else:
-        right_line_type = "unknown"
+    #LaneTracker 로 넘길 때만 계산
+    def tracker_img():
+        return warp(hybrid_binary(orig, ctx), M)
 
-    result = draw_lane_area_with_labels(
-        #original_img=cv.cvtColor(orig, cv.COLOR_BGR2RGB),
-        original_img=orig,
-        left_fit=result["left"]["fit"],
-        right_fit=result["right"]["fit"],
-        warped_shape=color.shape,
-        Minv=Minv,
-        left_color=(0, 255, 0),     # 초록
-        right_color=(255, 0, 0),    # 파랑
-        fill_color=(0, 255, 255),    # 차선 사이 채우기 (노랑)
-        left_type=left_line_type,
-        right_type=right_line_type
-    )
-    return result
+    return track_lane(orig, edges, None, Minv, LT, warped=True, render=render, tracker_img=tracker_img)
 
 
 # Open video file
@@ -1005,7 +1538,8 @@ def line_check_sobel(frame, M, Minv, LT):
 #video_file = 'project'
 
 def example():
-    cap = cv.VideoCapture('resource/test_video/REC_20250703_123827_1.avi')
+    video_path = 'resource/test_video/REC_20250703_123827_1.avi'
+    cap = cv.VideoCapture(video_path)
 
     LT = LaneTracker(margin=50)
     #img = cv.imread('lane.jpg')
@@ -1022,21 +1556,13 @@ def example():
     # If challenge video is played -> Define different points for transformation 
 
     #차선 인식을 위한 다각형 좌표
+    #저장된 자동 보정 결과가 있으면 사용하고 없으면 처음 몇 초 동안 보정
     height, width = frame.shape[:2]
-    src = np.float32([
-        [width * 0.45, height * 0.57],
-        [width * 0.55, height * 0.57],
-        [width * 0.9, height],
-        [width * 0.1, height]
-    ])
-    dst = np.float32([
-        [width * 0.3, 0],
-        [width * 0.7, 0],
-        [width * 0.7, height],
-        [width * 0.3, height]
-    ])
-    M = warp_M(src, dst)
-    Minv = Re_warp(src, dst)
+    calibration_key = perspective_calibration.source_fingerprint(video_path, width, height)
+    perspective, cached = perspective_calibration.load_or_default(calibration_key, width, height)
+    calibrator = None if cached else perspective_calibration.PerspectiveCalibrator(width, height)
+    M = perspective["M"]
+    Minv = perspective["Minv"]
 
     prev_time = 0
 
@@ -1047,6 +1573,13 @@ def example():
         ret, frame = cap.read()
         if (frame is None):
             break
+        if calibrator is not None and calibrator.feed(frame):
+            if calibrator.result is not None:
+                perspective_calibration.save_cached(calibration_key, calibrator.result)
+                M = calibrator.result["M"]
+                Minv = calibrator.result["Minv"]
+                LT.reset()
+            calibrator = None
         frame = line_check(frame, M, Minv, LT)
 
         curr_time = time.time()
@@ -0,0 +1,54 @@
+#프로세스 전체에서 한번만 불러오는 모델/리소스 저장소
+#창이 열리자마자 백그라운드 스레드에서 검출기, 경고 이미지 등을 불러오고 (검출기는 warm-up 까지)
+#이후 VideoThread 들은 불러온 것을 그대로 받아 씀 (Start 를 눌러도 다시 불러오지 않음)
+
+
+import threading
+import time
+
+
+#name 별 loader 함수를 등록해두고 preload 로 한번에 불러옴
+#get 은 아직 불러오는 중이면 끝날 때까지 기다림 (GUI 스레드가 아닌 곳에서 호출)
+class ModelRegistry:
+    def __init__(self):
+        self.loaders = {}
+        self.items = {}
+        self.errors = {}
+        self.lock = threading.Lock()
+        self.loaded = threading.Event()
+        self.thread = None
+
+    #preload 전에 등록해야 함
+    def register(self, name, loader):
+        self.loaders[name] = loader
+
+    #백그라운드에서 불러오기 시작 (여러번 불러도 한번만 실행)
+    def preload(self):
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.load_all, name="model-registry", daemon=True)
+                self.thread.start()
+
+    def load_all(self):
+        for name, loader in self.loaders.items():
+            start = time.time()
+            try:
+                self.items[name] = loader()
+            except Exception as e:
+                self.errors[name] = e
+                print(f"[ModelRegistry] {name} load failed: {e}")
+            else:
+                print(f"[ModelRegistry] {name} loaded ({(time.time() - start) * 1000:.0f} ms)")
+        self.loaded.set()
+
+    @property
+    def ready(self):
+        return self.loaded.is_set()
+
+    #불러온 것 반환, preload 를 안했으면 여기서 시작하고 기다림
+    def get(self, name):
+        self.preload()
+        self.loaded.wait()
+        if name in self.errors:
+            raise self.errors[name]
+        return self.items[name]
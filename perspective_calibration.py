@@ -0,0 +1,236 @@
+#원근 변환 영역(src 사다리꼴) 자동 보정 모듈
+#처음 몇 초 동안의 차선 선분으로 소실점과 사다리꼴을 추정하고
+#결과(src, dst, M, Minv)를 카메라/영상별 키로 캐시해서 다음 실행부터는 바로 불러옴
+
+
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+import cv2 as cv
+import numpy as np
+
+resource_path = Path(__file__).parent / "resource"
+CACHE_PATH = resource_path / "cache" / "perspective.json"
+
+#기본 사다리꼴에서 소실점 아래 사다리꼴 윗변까지의 비율 (0.57h 윗변, 약 0.51h 소실점 기준)
+TOP_RATIO = 0.124
+
+
+#기존에 쓰던 고정 비율 사다리꼴
+#width, height : 프레임 크기
+def default_trapezoid(width, height):
+    src = np.float32([
+        [width * 0.45, height * 0.57],
+        [width * 0.55, height * 0.57],
+        [width * 0.9, height],
+        [width * 0.1, height]
+    ])
+    dst = np.float32([
+        [width * 0.3, 0],
+        [width * 0.7, 0],
+        [width * 0.7, height],
+        [width * 0.3, height]
+    ])
+    return src, dst
+
+
+#영상/카메라 구분용 키
+#파일이면 파일 이름, 크기, 해상도 / 카메라 번호면 번호와 해상도
+def source_fingerprint(source, width, height):
+    if isinstance(source, int) or str(source).isdigit():
+        raw = f"camera:{source}:{width}x{height}"
+    else:
+        path = Path(source)
+        size = path.stat().st_size if path.exists() else 0
+        raw = f"file:{path.name}:{size}:{width}x{height}"
+    return hashlib.sha1(raw.encode()).hexdigest()[:16]
+
+
+#저장된 보정 결과 읽기, 없으면 None
+#반환 : dict(src, dst, M, Minv, vanishing_point)
+def load_cached(key, cache_path=CACHE_PATH):
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            entry = json.load(f).get(key)
+    except (OSError, ValueError):
+        return None
+    if entry is None:
+        return None
+    return {
+        "src": np.float32(entry["src"]),
+        "dst": np.float32(entry["dst"]),
+        "M": np.array(entry["M"], dtype=np.float64),
+        "Minv": np.array(entry["Minv"], dtype=np.float64),
+        "vanishing_point": tuple(entry["vanishing_point"]),
+    }
+
+
+def save_cached(key, calibration, cache_path=CACHE_PATH):
+    cache_path = Path(cache_path)
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        data = {}
+    data[key] = {
+        "src": calibration["src"].tolist(),
+        "dst": calibration["dst"].tolist(),
+        "M": np.asarray(calibration["M"]).tolist(),
+        "Minv": np.asarray(calibration["Minv"]).tolist(),
+        "vanishing_point": list(calibration["vanishing_point"]),
+        "created": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"[PerspectiveCalibrator] cache save failed: {e}")
+
+
+#캐시에 있으면 캐시 값, 없으면 기본 사다리꼴
+#반환 : (calibration dict, 캐시에서 읽었는지 여부)
+def load_or_default(key, width, height, cache_path=CACHE_PATH):
+    cached = load_cached(key, cache_path)
+    if cached is not None:
+        return cached, True
+    return default_perspective(width, height), False
+
+
+#보정 전 기본 사다리꼴로 만든 원근 변환 (load_or_default 와 같은 형식)
+def default_perspective(width, height):
+    src, dst = default_trapezoid(width, height)
+    return {
+        "src": src,
+        "dst": dst,
+        "M": cv.getPerspectiveTransform(src, dst),
+        "Minv": cv.getPerspectiveTransform(dst, src),
+        "vanishing_point": (width * 0.5, height * 0.509),
+    }
+
+
+#처음 몇 초 동안 프레임을 받아서 소실점과 사다리꼴을 추정하는 클래스
+#width, height : 프레임 크기, max_frames : 보정에 쓸 최대 프레임 수 (fps * 초)
+#min_segments : 좌우 각각 필요한 최소 선분 수
+class PerspectiveCalibrator:
+    def __init__(self, width, height, max_frames=90, min_segments=30):
+        self.width = width
+        self.height = height
+        self.max_frames = max_frames
+        self.min_segments = min_segments
+        self.frames = 0
+        #선분 : (x1, y1, x2, y2, 길이)
+        self.left_segments = []
+        self.right_segments = []
+        self.result = None
+        self.done = False
+
+    #프레임 한장에서 차선 후보 선분 수집
+    #반환 : 보정이 끝났으면 True (성공 여부는 self.result 가 None 인지로 확인)
+    def feed(self, frame):
+        if self.done:
+            return True
+        self.frames += 1
+        y0 = int(self.height * 0.55)
+        gray = cv.cvtColor(frame[y0:], cv.COLOR_BGR2GRAY)
+        edges = cv.Canny(cv.GaussianBlur(gray, (5, 5), 0), 50, 150)
+        lines = cv.HoughLinesP(edges, 1, np.pi / 180, 40, minLineLength=40, maxLineGap=20)
+        if lines is not None:
+            for x1, y1, x2, y2 in lines.reshape(-1, 4):
+                y1 += y0
+                y2 += y0
+                dx, dy = x2 - x1, y2 - y1
+                if dx == 0:
+                    continue
+                slope = dy / dx
+                #너무 눕거나 너무 선 선분은 차선이 아님
+                if not 0.3 < abs(slope) < 3.0:
+                    continue
+                length = float(np.hypot(dx, dy))
+                mid_x = (x1 + x2) / 2
+                #이미지 좌표에서 왼쪽 차선은 기울기 음수, 오른쪽 차선은 양수
+                if slope < 0 and mid_x < self.width * 0.5:
+                    self.left_segments.append((x1, y1, x2, y2, length))
+                elif slope > 0 and mid_x > self.width * 0.5:
+                    self.right_segments.append((x1, y1, x2, y2, length))
+
+        enough = len(self.left_segments) >= self.min_segments * 3 and len(self.right_segments) >= self.min_segments * 3
+        if self.frames >= self.max_frames or enough:
+            self.result = self.estimate()
+            self.done = True
+        return self.done
+
+    #선분들을 ax + by + c = 0 형태의 직선으로 (a^2 + b^2 = 1)
+    @staticmethod
+    def to_lines(segments):
+        seg = np.array(segments, dtype=np.float64)
+        a = seg[:, 3] - seg[:, 1]
+        b = seg[:, 0] - seg[:, 2]
+        norm = np.hypot(a, b)
+        a, b = a / norm, b / norm
+        c = -(a * seg[:, 0] + b * seg[:, 1])
+        return a, b, c, seg[:, 4]
+
+    #모든 직선과의 거리 제곱합(길이 가중)이 최소인 점 = 소실점
+    #멀리 떨어진 직선을 한번 걸러내고 다시 계산
+    def vanishing_point(self, a, b, c, w):
+        keep = np.ones(len(a), dtype=bool)
+        vp = None
+        for _ in range(2):
+            A = np.stack([a[keep], b[keep]], axis=1) * np.sqrt(w[keep])[:, None]
+            rhs = -c[keep] * np.sqrt(w[keep])
+            vp, *_ = np.linalg.lstsq(A, rhs, rcond=None)
+            dist = np.abs(a * vp[0] + b * vp[1] + c)
+            keep = dist < max(self.width * 0.02, np.percentile(dist, 60))
+            if keep.sum() < 4:
+                break
+        return vp
+
+    #선분들의 프레임 맨 아래(y = height)에서의 x 위치 (길이 가중 중앙값)
+    def bottom_x(self, segments):
+        seg = np.array(segments, dtype=np.float64)
+        x = seg[:, 0] + (self.height - seg[:, 1]) * (seg[:, 2] - seg[:, 0]) / (seg[:, 3] - seg[:, 1])
+        order = np.argsort(x)
+        cum = np.cumsum(seg[order, 4])
+        return x[order][np.searchsorted(cum, cum[-1] / 2)]
+
+    def estimate(self):
+        if len(self.left_segments) < self.min_segments or len(self.right_segments) < self.min_segments:
+            print(f"[PerspectiveCalibrator] not enough lane evidence "
+                  f"(left={len(self.left_segments)}, right={len(self.right_segments)})")
+            return None
+        a, b, c, w = self.to_lines(self.left_segments + self.right_segments)
+        vx, vy = self.vanishing_point(a, b, c, w)
+        left_x = self.bottom_x(self.left_segments)
+        right_x = self.bottom_x(self.right_segments)
+
+        #추정값이 말이 안되면 실패로 처리
+        if not (0.2 * self.width < vx < 0.8 * self.width and 0.2 * self.height < vy < 0.8 * self.height):
+            print(f"[PerspectiveCalibrator] vanishing point out of range: ({vx:.0f}, {vy:.0f})")
+            return None
+        if not (left_x < vx < right_x and right_x - left_x > 0.2 * self.width):
+            print(f"[PerspectiveCalibrator] lane base out of range: {left_x:.0f}, {right_x:.0f}")
+            return None
+
+        #아래 변은 좌우 차선 위치, 윗변은 소실점 방향으로 모이는 직선 위
+        top_y = vy + (self.height - vy) * TOP_RATIO
+        t = (top_y - vy) / (self.height - vy)
+        src = np.float32([
+            [vx + (left_x - vx) * t, top_y],
+            [vx + (right_x - vx) * t, top_y],
+            [right_x, self.height],
+            [left_x, self.height]
+        ])
+        _, dst = default_trapezoid(self.width, self.height)
+        return {
+            "src": src,
+            "dst": dst,
+            "M": cv.getPerspectiveTransform(src, dst),
+            "Minv": cv.getPerspectiveTransform(dst, src),
+            "vanishing_point": (float(vx), float(vy)),
+        }
@@ -0,0 +1,471 @@
+#차선 검출 + YOLO 검출 + 거리 경고 처리 파이프라인 (PyQt5 를 쓰지 않음)
+#GUI(main.py 의 VideoThread)와 명령줄 실행(headless.py)이 같은 코드로 영상을 처리
+#설정값과 공용 모델 저장소(models)도 여기에 둠
+
+
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+import cv2
+import numpy as np
+
+import geometry
+import perspective_calibration
+import line_check_frame
+from sprites import Sprite
+from compositor import AnnotationCompositor
+from detector import DetectorROI, create_detector
+from box_tracker import BoxTracker, DetectionScheduler
+from model_registry import ModelRegistry
+from ground_distance import GroundDistanceModel
+from frame_source import FrameSource
+from video_writer import AsyncVideoWriter
+from lane_zones import LaneZoneMask, ZONE_ADJACENT, ZONE_EGO, ZONE_UNKNOWN
+
+# --- 설정값 ---
+CONF_THRESHOLD = 0.3
+DIST_THRESHOLD = 1200  # cm
+FOCAL_LENGTH = 400
+RESIZE_WIDTH = 1280
+RESIZE_HEIGHT = 720
+
+# 차선 검출과 YOLO 를 프레임마다 동시에 실행 (둘 다 OpenCV / torch 안에서 GIL 을 놓음)
+CONCURRENT_INFERENCE = True
+# 동시 실행할 때 코어 나누기 : 차선 검출(OpenCV) 스레드 수, YOLO(torch) 스레드 수 (0 이면 라이브러리 기본값)
+LANE_CV_THREADS = 2
+YOLO_TORCH_THREADS = 0
+# 오프라인 처리(영상 파일 -> 결과 파일) 때 YOLO 한번에 넣을 프레임 수
+OFFLINE_BATCH_SIZE = 8
+# 읽기 스레드가 미리 디코딩해 둘 최대 프레임 수
+PREFETCH_FRAMES = 8
+# 실시간 모드 : 영상 시각에 맞춰 가장 최근 프레임만 처리 (밀린 프레임은 버려서 지연이 쌓이지 않음)
+# False 면 모든 프레임을 처리하는 오프라인 모드
+REALTIME_MODE = False
+# 결과 영상 저장 : 코덱 (XVID, mp4v, MJPG, raw), 저장 대기 큐 크기, 큐가 가득 찼을 때 (block, drop, reduce)
+OUTPUT_CODEC = "XVID"
+WRITER_QUEUE_SIZE = 32
+WRITER_POLICY = "block"
+
+# 차선 검출 모듈 이름 (GUI 선택 목록, headless.py --module)
+LANE_MODULES = ("line_check", "line_check_sobel", "line_check_hybrid", "line_check_hough", "line_check_scanline")
+
+# YOLO 입력 크기, 검출 영역(차선 주변만 잘라서 검출) 사용 여부
+DETECT_IMGSZ = 640
+DETECT_ROI = True
+# 검출 영역 : 소실점 위로 더 포함할 높이 비율, 차선 사다리꼴 좌우로 더 포함할 폭 비율
+ROI_ABOVE_HORIZON = 0.15
+ROI_SIDE_MARGIN = 0.1
+
+# YOLO 검출 간격 기본값 (프레임), 사이 프레임은 박스 추적으로 채움 (1 이면 매 프레임 검출)
+# 간격 검출은 GUI 의 Detect every 선택이나 headless.py 의 --detect-interval 로만 켬
+DETECT_INTERVAL = 1
+# 마지막 검출 프레임과의 축소 흑백 이미지 평균 차이가 이 값 이상이면 간격과 상관없이 바로 검출
+SCENE_CHANGE_THRESHOLD = 25.0
+
+# 차선 구역별 처리 : 거리 계산/라벨은 내 차선, 옆 차선만, 경고/전송은 내 차선만
+# (차선을 못 찾았거나 추적 중인 차선보다 먼 물체는 ZONE_UNKNOWN 으로 기존처럼 모두 처리)
+DISTANCE_ZONES = (ZONE_EGO, ZONE_ADJACENT, ZONE_UNKNOWN)
+WARNING_ZONES = (ZONE_EGO, ZONE_UNKNOWN)
+
+KNOWN_HEIGHTS = {
+    0: 160,  # 사람
+    2: 150,  # 자동차
+    3: 100,  # 오토바이
+    5: 350,  # 버스
+    7: 350   # 트럭
+}
+CLASS_COLORS = {
+    0: (0, 255, 255),
+    2: (0, 255, 0),
+    3: (255, 0, 0),
+    5: (255, 255, 0),
+    7: (255, 0, 255)
+}
+VALID_CLASS_IDS = list(KNOWN_HEIGHTS.keys())
+# 클래스 번호 -> 실제 높이(cm) 표, 배열 인덱싱으로 한번에 찾기 위함
+KNOWN_HEIGHT_TABLE = np.full(max(VALID_CLASS_IDS) + 1, 170.0)
+for _class_id, _height in KNOWN_HEIGHTS.items():
+    KNOWN_HEIGHT_TABLE[_class_id] = _height
+resource_path = Path(__file__).parent / "resource"
+MODEL_PATH = "resource/best.pt"
+# best.pt 를 yolo export format=onnx imgsz=640 으로 변환한 파일 (onnx backend 용)
+ONNX_MODEL_PATH = "resource/best.onnx"
+# 검출기 backend : "ultralytics" (torch) 또는 "onnx" (OpenCV DNN, torch 없이 동작)
+DETECTOR_BACKEND = "ultralytics"
+DETECTOR_MODEL_PATHS = {
+    "ultralytics": MODEL_PATH,
+    "onnx": ONNX_MODEL_PATH,
+}
+WARNING_BANNER_PATH = "resource/warning_banner.png"
+WARNING_ICON_PATH = "resource/warning_icon.png"  
+
+
+# OpenCV / torch 내부 스레드 수 설정 (둘 다 프로세스 전체에 적용)
+# 0 이면 바꾸지 않음, torch 는 ultralytics backend 로 이미 불러온 경우에만 설정
+# detector_uses_opencv : 검출기도 OpenCV(cv2.dnn) 로 돌면 OpenCV 스레드 수를 줄이면 YOLO 까지 같이 줄어들므로 그대로 둠
+def configure_threads(cv_threads=LANE_CV_THREADS, torch_threads=YOLO_TORCH_THREADS, detector_uses_opencv=False):
+    if cv_threads > 0 and not detector_uses_opencv:
+        cv2.setNumThreads(cv_threads)
+    if torch_threads > 0 and "torch" in sys.modules:
+        sys.modules["torch"].set_num_threads(torch_threads)
+
+# 검출기를 만들고 빈 프레임으로 warm-up
+# 입력 버퍼는 오프라인 묶음 크기로 미리 잡고, warm-up 은 보정 전 기본 원근 변환의 검출 영역 크기로 함
+# backend : DETECTOR_BACKENDS 의 이름, path : 모델 파일 (None 이면 DETECTOR_MODEL_PATHS 의 기본 경로)
+def load_detector(backend=DETECTOR_BACKEND, path=None):
+    detector = create_detector(backend, path or DETECTOR_MODEL_PATHS[backend],
+                               imgsz=DETECT_IMGSZ, conf=CONF_THRESHOLD, iou=0.5,
+                               classes=VALID_CLASS_IDS, max_batch=OFFLINE_BATCH_SIZE)
+    perspective = perspective_calibration.default_perspective(RESIZE_WIDTH, RESIZE_HEIGHT)
+    detector.warm_up((RESIZE_HEIGHT, RESIZE_WIDTH, 3), VideoPipeline.detector_roi(perspective))
+    return detector
+
+
+# 프로세스 전체에서 한번만 불러오는 모델과 리소스
+# 창이 열릴 때 백그라운드에서 불러오기 시작하고, VideoPipeline 은 불러온 것을 받아 씀
+models = ModelRegistry()
+# 유효한 클래스만 검출 (NMS 전에 걸러짐), 박스는 프레임 좌표의 NumPy 배열로 받음
+models.register("detector", load_detector)
+# 경고 배너/아이콘은 premultiplied alpha 스프라이트로 한번만 변환
+models.register("warning_banner", lambda: Sprite.load(WARNING_BANNER_PATH, scale=0.5))
+models.register("warning_icon", lambda: Sprite.load(WARNING_ICON_PATH, size=(60, 60)))
+
+# --- 영상 처리 파이프라인 ---
+# 영상 한개를 처음부터 끝까지 (또는 stop 까지) 처리, run 을 부른 스레드에서 동작
+class VideoPipeline:
+    # output_path : 결과 영상 저장 경로 (None 이면 저장 안함)
+    # concurrent : 차선 검출과 YOLO 를 동시에 실행할지
+    # batch_size : YOLO 를 몇 프레임씩 묶어서 돌릴지 (오프라인 처리용, 실시간 화면은 1)
+    # detect_interval : YOLO 검출 간격 (프레임)
+    # realtime : 실시간 모드 (영상 시각에 맞춰 최근 프레임만 처리, batch_size 는 1 로 고정)
+    # output_codec, writer_policy : 결과 영상 코덱, 저장 큐가 가득 찼을 때의 동작 (video_writer.py)
+    # socket_client : 경고를 보낼 SocketClient (None 이면 보내지 않음)
+    # frame_callback : 그린 결과 이미지를 받을 함수 (화면 표시용, None 이면 저장할 때만 그림)
+    # progress_callback : 프레임 하나를 처리할 때마다 (Frame, 지연 초) 로 불림
+    def __init__(self, module_name: str, video_path: str, output_path: Optional[str] = "output.mp4",
+                 concurrent: bool = CONCURRENT_INFERENCE, batch_size: int = 1,
+                 detect_interval: int = DETECT_INTERVAL, realtime: bool = REALTIME_MODE,
+                 output_codec: str = OUTPUT_CODEC, writer_policy: str = WRITER_POLICY,
+                 socket_client=None, frame_callback=None, progress_callback=None):
+        self.socket_client = socket_client
+        self.frame_callback = frame_callback
+        self.progress_callback = progress_callback
+        self.module_name = module_name
+        self.video_path = video_path
+        self.output_path = output_path
+        self.concurrent = concurrent
+        self.batch_size = batch_size
+        self.detect_interval = detect_interval
+        self.realtime = realtime
+        self.output_codec = output_codec
+        self.writer_policy = writer_policy
+        self.running = True
+        self.source = None
+
+        # YOLO 검출기, 경고 리소스는 공용 저장소(models)에서 run 시작할 때 받아옴
+        self.detector = None
+        self.warning_banner = None
+        self.warning_icon = None
+        # 프레임마다 그릴 것(차선, 박스, 라벨, 아이콘, 배너, FPS)을 모아뒀다가 필요할 때만 한번에 그림
+        self.compositor = AnnotationCompositor()
+
+    # --- 객체 검출 후 거리 계산 및 경고 표시 ---
+    # 박스 전체를 한번에 NumPy 로 바꿔서 필터, 좌표 변환, 거리 계산을 배열 연산으로 처리
+    # 그리기는 compositor 에 명령으로만 쌓음
+    # data : 프레임 한장의 박스 배열 (N, 6) : x1, y1, x2, y2, conf, cls (프레임 좌표)
+    #        추적 결과 (N, 7) : x1, y1, x2, y2, id, conf, cls 도 그대로 받음
+    # distance_model : 현재 원근 변환으로 만든 GroundDistanceModel
+    # zones : 이번 프레임 차선으로 갱신한 LaneZoneMask
+    def process_detections(self, data, distance_model, zones, frame_shape, compositor):
+        if len(data) == 0:
+            return False
+        xyxy = data[:, :4].astype(np.int32)
+        conf = data[:, -2]
+        class_ids = data[:, -1].astype(np.int32)
+        pixel_height = xyxy[:, 3] - xyxy[:, 1]
+
+        keep = np.isin(class_ids, VALID_CLASS_IDS) & (conf > CONF_THRESHOLD) & (pixel_height > 20)
+        if not keep.any():
+            return False
+        xyxy, class_ids, pixel_height = xyxy[keep], class_ids[keep], pixel_height[keep]
+
+        # 박스 아래 중앙(바닥에 닿는 점)으로 차선 구역을 나누고, 관계없는 차선의 물체는 박스만 그림
+        zone = zones.classify((xyxy[:, 0] + xyxy[:, 2]) / 2, xyxy[:, 3])
+        relevant = np.isin(zone, DISTANCE_ZONES)
+        for x1i, y1i, x2i, y2i, class_id in zip(*xyxy[~relevant].T, class_ids[~relevant]):
+            compositor.box((int(x1i), int(y1i)), (int(x2i), int(y2i)), CLASS_COLORS.get(int(class_id), (255, 255, 255)), 1)
+        if not relevant.any():
+            return False
+        xyxy, class_ids, pixel_height, zone = xyxy[relevant], class_ids[relevant], pixel_height[relevant], zone[relevant]
+        x1, y1, x2, y2 = xyxy.T
+
+        # 박스 기준점 (가로 중앙, 아래에서 20% 위) 의 원근 변환 좌표와 거리 (왜곡 보정이 없으면 줄 단위 표에서 찾음)
+        anchor_x = (x1 + x2) / 2
+        anchor_y = y2 - 0.2 * pixel_height
+        anchors_warped = distance_model.project(anchor_x, anchor_y)
+        distance_cm = distance_model.distance(anchors_warped[:, 1], pixel_height, KNOWN_HEIGHT_TABLE[class_ids])
+        warning = (distance_cm < DIST_THRESHOLD) & np.isin(zone, WARNING_ZONES)
+
+        for i in range(len(xyxy)):
+            class_id = int(class_ids[i])
+            x1i, y1i, x2i, y2i = (int(v) for v in xyxy[i])
+            if warning[i]:
+                box_color = (0, 0, 255)
+                thickness = 3
+                # 경고 아이콘 오버레이
+                if self.warning_icon is not None:
+                    icon_x = x1i
+                    icon_y = y1i - self.warning_icon.shape[0] - 10
+                    compositor.sprite(self.warning_icon, icon_x, icon_y)
+                # self.socket_client.set_data(class_id,  distance_cm, annotated_frame)
+                if self.socket_client is not None:
+                    self.socket_client.set_data(class_id, float(distance_cm[i]), frame_shape[0])
+            else:
+                box_color = CLASS_COLORS.get(class_id, (255, 255, 255))
+                thickness = 2
+            compositor.box((x1i, y1i), (x2i, y2i), box_color, thickness)
+            dist_label = f"{distance_cm[i] / 100:.1f}m"
+            compositor.label(dist_label, (x1i, y2i + 25), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 0), 2)
+            compositor.circle((int(anchors_warped[i, 0]), int(anchors_warped[i, 1])), 5, (255, 0, 0), -1)
+        return bool(warning.any())
+
+    # YOLO 검출, frames : 프레임 리스트 (한번의 호출로 묶어서 추론), roi : DetectorROI 또는 None
+    # 반환 : 프레임 순서대로의 박스 배열 리스트
+    def detect(self, frames, roi=None):
+        if not frames:
+            return []
+        return self.detector(frames, roi)
+
+    # 원근 변환 보정 결과(소실점, 차선 사다리꼴)로 검출 영역 계산, 사용 안하면 None
+    @staticmethod
+    def detector_roi(perspective):
+        if not DETECT_ROI:
+            return None
+        return DetectorROI.from_perspective(perspective, (RESIZE_WIDTH, RESIZE_HEIGHT),
+                                            above_horizon=ROI_ABOVE_HORIZON, side_margin=ROI_SIDE_MARGIN)
+
+    # 원근 변환 M 으로 줄 단위 지면 거리 표 만들기
+    @staticmethod
+    def distance_model(M):
+        return GroundDistanceModel(M, (RESIZE_WIDTH, RESIZE_HEIGHT), far_cm=DIST_THRESHOLD,
+                                   focal_length=FOCAL_LENGTH)
+
+    # 공용 저장소에서 검출기와 경고 이미지를 받아옴 (아직 불러오는 중이면 이 스레드에서 기다림)
+    # 반환 : 성공 여부
+    def load_models(self):
+        try:
+            self.detector = models.get("detector")
+            self.warning_banner = models.get("warning_banner")
+            self.warning_icon = models.get("warning_icon")
+        except Exception as e:
+            print(f"[VideoPipeline] model load failed: {e}")
+            return False
+        return True
+
+    # 결과 이미지를 쓰는 곳(화면 표시 또는 영상 저장)이 있는지
+    # 없으면 그리기를 전부 건너뜀
+    def needs_render(self):
+        return self.output_path is not None or self.frame_callback is not None
+
+# --- 영상 처리 ---
+    # 반환 : source.stats() 에 전체 처리 시간(elapsed, 초)과 처리 속도(fps)를 더한 dict
+    #        모델을 못 불러왔거나 모듈 이름이 잘못되었거나 결과 영상을 열 수 없으면 None
+    def run(self):
+        if not self.load_models():
+            return None
+
+        line_check_module = line_check_frame
+        # 동적 모듈 로딩
+        if self.module_name == "line_check":
+            line_check_func = line_check_module.line_check
+            
+        elif self.module_name == "line_check_sobel":
+            line_check_func = line_check_module.line_check_sobel
+        elif self.module_name == "line_check_hybrid":
+            line_check_func = line_check_module.line_check_hybrid
+        elif self.module_name == "line_check_hough":
+            line_check_func = line_check_module.line_check_hough
+        elif self.module_name == "line_check_scanline":
+            # 전처리는 line_check 와 같고 차선 추적만 샘플링 줄 방식
+            line_check_func = line_check_module.line_check
+        else:
+            print(f"Unknown module: {self.module_name}")
+            return None
+
+        LaneTracker = line_check_module.LaneTracker
+        
+
+        # 디코딩과 크기 조정은 읽기 스레드에서 미리 해둠 (실시간 모드면 영상 시각에 맞춰 읽음)
+        source = self.source = FrameSource(self.video_path, (RESIZE_WIDTH, RESIZE_HEIGHT), PREFETCH_FRAMES,
+                                           realtime=self.realtime)
+        # 결과 영상은 저장 스레드에서 인코딩 (원본 영상과 같은 fps)
+        out = None
+        if self.output_path is not None:
+            try:
+                out = AsyncVideoWriter(self.output_path, (RESIZE_WIDTH, RESIZE_HEIGHT), source.fps,
+                                       codec=self.output_codec, queue_size=WRITER_QUEUE_SIZE,
+                                       policy=self.writer_policy)
+            except RuntimeError as e:
+                print(f"[VideoPipeline] {e}")
+                source.close()
+                return None
+        render = self.needs_render()
+        compositor = self.compositor
+
+        # 영상/카메라별로 저장된 원근 변환 영역이 있으면 바로 사용
+        # 없으면 기본 사다리꼴로 시작하고 처음 몇 초 동안의 차선으로 자동 보정
+        calibration_key = perspective_calibration.source_fingerprint(self.video_path, RESIZE_WIDTH, RESIZE_HEIGHT)
+        perspective, cached = perspective_calibration.load_or_default(calibration_key, RESIZE_WIDTH, RESIZE_HEIGHT)
+        calibrator = None
+        if not cached:
+            source_fps = source.fps
+            calibrator = perspective_calibration.PerspectiveCalibrator(
+                RESIZE_WIDTH, RESIZE_HEIGHT, max_frames=int(source_fps * 3))
+        camera = geometry.CameraCalibration.from_ini()
+
+        # 카메라 왜곡 보정 + 원근 변환을 합친 remap 테이블 (resource/cache 에 캐시)
+        # M, Minv 자리에 그대로 넘기면 warp / 역투영 / 좌표 변환이 모두 이 테이블을 사용
+        M = Minv = geometry.RemapWarp(perspective["M"], perspective["Minv"], camera,
+                                      frame_size=(RESIZE_WIDTH, RESIZE_HEIGHT))
+        roi = self.detector_roi(perspective)
+        # 줄 단위 지면 거리 표 (원근 변환이 바뀔 때만 다시 계산)
+        distance_model = self.distance_model(M)
+        # 차선 구역 지도 (프레임마다 차선 결과로 다시 그림)
+        zones = LaneZoneMask((RESIZE_WIDTH, RESIZE_HEIGHT))
+
+        LT = LaneTracker(nwindows=9, margin=50, minimum=30)
+        if self.module_name == "line_check_hough":
+            # 직선 구간은 Hough, 곡선 구간은 LaneTracker 로 자동 전환
+            LT = line_check_module.HoughLaneTracker(LT)
+        elif self.module_name == "line_check_scanline":
+            LT = line_check_module.ScanlineLaneTracker(rows=24, margin=50)
+
+        warning_counter = 0
+
+        # 자동 보정이 끝난 뒤의 새 remap 테이블은 별도 스레드에서 만듦 (캐시가 없으면 720p 에서 수백 ms)
+        # 다 만들어질 때까지는 이전 원근 변환으로 계속 처리하고, 끝나면 프레임 사이에서 교체
+        warp_executor = None
+        pending_warp = None
+
+        # 동시 실행 모드 : YOLO 는 작업 스레드에서, 차선 검출은 이 스레드에서 돌리고 process_detections 전에 합침
+        # 프레임당 시간이 (차선 + YOLO) 대신 max(차선, YOLO) 에 가까워짐
+        executor = None
+        if self.concurrent:
+            configure_threads(detector_uses_opencv=self.detector.uses_opencv)
+            executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="yolo")
+
+        # 한번에 읽어서 YOLO 를 한번만 호출할 프레임 수 (1 이면 프레임마다 호출)
+        # 실시간 모드는 묶음을 모으는 동안 지연이 생기므로 항상 1
+        batch_size = 1 if self.realtime else max(1, self.batch_size)
+        # N 프레임마다 (또는 장면이 바뀌면) 검출하고, 사이 프레임은 박스를 예측해서 id 를 유지
+        scheduler = DetectionScheduler(self.detect_interval, SCENE_CHANGE_THRESHOLD)
+        tracker = BoxTracker()
+        lag = 0.0
+        run_start = time.time()
+
+        # 다른 스레드의 stop 은 source 의 stop 이벤트로 알 수 있음 (캡처 객체는 여기서 건드리지 않음)
+        while source.opened and self.running and not source.stopping:
+            start_time = time.time()
+            batch = source.read_batch(batch_size)
+            frames = [item.image for item in batch]
+            if not frames:
+                break
+            # 검출할 프레임만 골라서 YOLO 검출 (동시 실행 모드면 먼저 작업 스레드에 넘김)
+            # 두 작업 모두 frame 을 읽기만 하므로 복사 없이 같이 씀
+            detect_flags = [scheduler.should_detect(frame) for frame in frames]
+            detect_frames = [frame for frame, flag in zip(frames, detect_flags) if flag]
+            yolo_future = executor.submit(self.detect, detect_frames, roi) if executor is not None else None
+
+            # 차선 추적은 프레임 순서대로 (그리기는 compositor 에서)
+            # 묶음 중간에 원근 변환이 바뀔 수 있으므로 프레임마다 당시의 거리 표, Minv 와 차선 결과를 보관
+            lanes = []
+            for frame in frames:
+                # 자동 보정이 끝나면 결과를 저장하고 새 원근 변환의 remap 테이블 만들기 시작
+                if calibrator is not None and calibrator.feed(frame):
+                    if calibrator.result is not None:
+                        perspective_calibration.save_cached(calibration_key, calibrator.result)
+                        warp_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="remap")
+                        pending_warp = (calibrator.result, warp_executor.submit(
+                            geometry.RemapWarp, calibrator.result["M"], calibrator.result["Minv"], camera,
+                            frame_size=(RESIZE_WIDTH, RESIZE_HEIGHT)))
+                    calibrator = None
+                # remap 테이블이 다 만들어졌으면 새 원근 변환으로 교체
+                if pending_warp is not None and pending_warp[1].done():
+                    new_perspective, future = pending_warp
+                    pending_warp = None
+                    M = Minv = future.result()
+                    LT.reset()
+                    roi = self.detector_roi(new_perspective)
+                    distance_model = self.distance_model(M)
+                line_check_func(frame, M, Minv, LT, render=False)
+                lanes.append((LT.last_lane, distance_model, Minv))
+
+            results = yolo_future.result() if yolo_future is not None else self.detect(detect_frames, roi)
+            results = iter(results)
+            frame_time = (time.time() - start_time) / len(frames)
+
+            for item, frame, detected, (lane, frame_distance, frame_Minv) in zip(batch, frames, detect_flags, lanes):
+                compositor.lane(lane, frame_Minv, LT.overlay_cache)
+                zones.update(lane, frame_Minv)
+                # 검출한 프레임은 추적기 갱신, 아니면 예측 박스 사용
+                boxes = tracker.update(next(results)) if detected else tracker.predict()
+                # 객체+경고 표시
+                collision_warning = self.process_detections(boxes, frame_distance, zones, frame.shape, compositor)
+
+                warning_counter = min(warning_counter + 5, 30) if collision_warning else max(warning_counter - 1, 0)
+                # 경고 카운터가 있을 시, 경로상 경고 배너 이미지가 존재할 시 아래 로직 실행 
+                if warning_counter > 0 and self.warning_banner is not None:
+                    banner_width = self.warning_banner.shape[1]
+                    x_pos = int((RESIZE_WIDTH - banner_width) / 2)
+                    y_pos = -90
+                    compositor.sprite(self.warning_banner, x_pos, y_pos)
+
+                # FPS 계산 및 표시 (묶음으로 처리하면 묶음 시간을 프레임 수로 나눔)
+                fps = 1.0 / frame_time
+                compositor.text(f"FPS: {fps:.1f}", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 255), 2)
+                if self.realtime:
+                    # 직전 프레임의 지연과 지금까지 버린 프레임 수
+                    compositor.text(f"Lag: {lag * 1000:.0f}ms Drop: {source.dropped}", (10, 60),
+                                    cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 255), 2)
+
+                # 결과 이미지가 필요할 때만 그림
+                if not render:
+                    compositor.discard()
+                else:
+                    annotated_frame = compositor.render(frame)
+                    if out is not None:
+                        out.write(annotated_frame)
+                    if self.frame_callback is not None:
+                        self.frame_callback(annotated_frame)
+                # 프레임이 들어온 뒤 결과가 나오기까지의 지연
+                lag = source.record(item)
+                if self.progress_callback is not None:
+                    self.progress_callback(item, lag)
+
+        # 비디오 종료 후 리소스 정리    
+        if executor is not None:
+            executor.shutdown(wait=True)
+        if warp_executor is not None:
+            warp_executor.shutdown(wait=True)
+        source.close()
+        stats = source.stats()
+        stats["elapsed"] = time.time() - run_start
+        stats["fps"] = stats["processed"] / stats["elapsed"] if stats["elapsed"] > 0 else 0.0
+        print(f"[VideoPipeline] processed={stats['processed']} dropped={stats['dropped']} "
+              f"lag mean={stats['mean_lag_ms']:.1f}ms max={stats['max_lag_ms']:.1f}ms")
+        # 비디오 파일 저장
+        if out is not None:
+            out.close()
+        return stats
+
+#  --- 처리 중지 함수 (다른 스레드에서 호출) ---
+    # 읽기 스레드에 멈추라고 알리기만 하고, 영상은 run 이 끝날 때 처리 스레드에서 닫음
+    def stop(self):
+        self.running = False
+        if self.source is not None:
+            self.source.stop()
+
+        
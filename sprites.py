@@ -0,0 +1,135 @@
+#경고 배너, 아이콘 같은 투명 PNG 를 프레임에 올리는 모듈
+#불러올 때 한번만 premultiplied alpha 정수 형태로 바꿔두고
+#그릴 때는 OpenCV 연산 두번(곱하기, 더하기)으로 잘린 영역만 합성
+
+
+import cv2
+import numpy as np
+
+
+#미리 계산된 스프라이트
+#premult : color * alpha / 255 (uint8, BGR), inv_alpha : 255 - alpha (uint8, 3채널)
+#투명한 테두리는 잘라내고 offset 으로 위치를 보정
+class Sprite:
+    def __init__(self, image):
+        #잘라내기 전 원본 크기 (h, w), 위치 계산용
+        self.shape = image.shape[:2]
+        if image.ndim == 3 and image.shape[2] == 4:
+            alpha = image[:, :, 3]
+            ys, xs = np.nonzero(alpha)
+            if len(ys) == 0:
+                #전부 투명하면 그릴 것이 없음
+                self.offset = (0, 0)
+                self.premult = None
+                self.inv_alpha = None
+                self.size = (0, 0)
+                return
+            y0, y1, x0, x1 = ys.min(), ys.max() + 1, xs.min(), xs.max() + 1
+            image = image[y0:y1, x0:x1]
+            alpha = image[:, :, 3]
+            self.offset = (int(x0), int(y0))
+            alpha_3ch = cv2.merge([alpha] * 3)
+            self.premult = cv2.multiply(image[:, :, :3], alpha_3ch, scale=1 / 255.0)
+            if np.all(alpha == 255):
+                #완전히 불투명하면 복사만 하면 됨
+                self.inv_alpha = None
+            else:
+                #cv2.subtract(255, ...) 는 255 를 Scalar(255, 0, 0, 0) 로 보고 G, R 채널을 0 으로 만듦
+                self.inv_alpha = 255 - alpha_3ch
+        else:
+            self.offset = (0, 0)
+            self.premult = image[:, :, :3].copy()
+            self.inv_alpha = None
+        self.size = (self.premult.shape[1], self.premult.shape[0])
+
+    #path : 이미지 경로, size : (w, h) 로 리사이즈, scale : 비율로 리사이즈
+    #파일이 없으면 None
+    @classmethod
+    def load(cls, path, size=None, scale=None):
+        image = cv2.imread(str(path), cv2.IMREAD_UNCHANGED)
+        if image is None:
+            return None
+        if size is not None:
+            image = cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+        elif scale is not None:
+            image = cv2.resize(image, (0, 0), fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        return cls(image)
+
+    #(x, y) 에 그릴 때 frame_size (w, h) 안에 들어가는 영역
+    #반환 : (프레임 쪽 slice, 스프라이트 쪽 slice) 또는 안 겹치면 None
+    def clip(self, frame_size, x, y):
+        x += self.offset[0]
+        y += self.offset[1]
+        sw, sh = self.size
+        fw, fh = frame_size
+        if x >= fw or x + sw <= 0 or y >= fh or y + sh <= 0:
+            return None
+        fx0, fy0 = max(x, 0), max(y, 0)
+        fx1, fy1 = min(fw, x + sw), min(fh, y + sh)
+        return ((slice(fy0, fy1), slice(fx0, fx1)),
+                (slice(fy0 - y, fy1 - y), slice(fx0 - x, fx1 - x)))
+
+    #frame 의 (x, y) 에 스프라이트를 합성 (직접 수정), x, y 는 잘라내기 전 원본의 좌상단 기준
+    def draw(self, frame, x, y):
+        if self.premult is None:
+            return
+        region = self.clip((frame.shape[1], frame.shape[0]), x, y)
+        if region is None:
+            return
+        frame_region, sprite_region = region
+        roi = frame[frame_region]
+        premult = self.premult[sprite_region]
+        if self.inv_alpha is None:
+            roi[:] = premult
+            return
+        #frame * (255 - alpha) / 255 + color * alpha / 255
+        cv2.multiply(roi, self.inv_alpha[sprite_region], dst=roi, scale=1 / 255.0)
+        cv2.add(roi, premult, dst=roi)
+
+    #premultiplied 레이어 (premult, inv_alpha 같은 형태) 위에 스프라이트를 겹침 (둘 다 직접 수정)
+    #여러 스프라이트/선을 한 레이어로 합쳐두고 프레임에는 한번에 합성할 때 사용
+    def draw_layer(self, premult, inv_alpha, x, y):
+        if self.premult is None:
+            return
+        region = self.clip((premult.shape[1], premult.shape[0]), x, y)
+        if region is None:
+            return
+        frame_region, sprite_region = region
+        if self.inv_alpha is None:
+            premult[frame_region] = self.premult[sprite_region]
+            inv_alpha[frame_region] = 0
+            return
+        src_inv = self.inv_alpha[sprite_region]
+        roi = premult[frame_region]
+        cv2.multiply(roi, src_inv, dst=roi, scale=1 / 255.0)
+        cv2.add(roi, self.premult[sprite_region], dst=roi)
+        inv_roi = inv_alpha[frame_region]
+        cv2.multiply(inv_roi, src_inv, dst=inv_roi, scale=1 / 255.0)
+
+
+#한 프레임 동안의 스프라이트 그리기를 모아뒀다가 flush 때 한번에 그림
+#같은 스프라이트를 같은 위치에 여러번 그리는 것은 한번만 그림
+class SpriteBatch:
+    def __init__(self):
+        self.draws = []
+
+    def add(self, sprite, x, y):
+        if sprite is not None:
+            self.draws.append((sprite, int(x), int(y)))
+
+    def flush(self, frame):
+        seen = set()
+        for sprite, x, y in self.draws:
+            key = (id(sprite), x, y)
+            if key in seen:
+                continue
+            seen.add(key)
+            sprite.draw(frame, x, y)
+        self.draws.clear()
+        return frame
+
+    def clear(self):
+        self.draws.clear()
+
+    def __len__(self):
+        return len(self.draws)
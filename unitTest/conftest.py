@@ -0,0 +1,10 @@
+#pytest 설정 : 모듈들이 저장소 최상위에 있으므로 경로에 추가
+#test_gui.py 는 PyQt5 창을 띄우는 수동 확인용 스크립트라 테스트로 수집하지 않음
+
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+collect_ignore = ["test_gui.py"]
@@ -0,0 +1,69 @@
+#BoxTracker / DetectionScheduler 동작 확인
+
+
+import numpy as np
+
+from box_tracker import BoxTracker, DetectionScheduler
+
+
+def detection(x1, y1, x2, y2, conf=0.9, cls=2):
+    return np.array([[x1, y1, x2, y2, conf, cls]], dtype=np.float32)
+
+
+#같은 물체는 검출 사이 프레임에서도 같은 id 로 등속 이동
+def test_predict_keeps_id_and_moves_with_velocity():
+    tracker = BoxTracker()
+    tracker.update(detection(100, 100, 200, 200))
+    tracker.predict()
+    tracker.predict()
+    out = tracker.update(detection(130, 100, 230, 200))
+    assert out[:, 4].tolist() == [1]
+    predicted = tracker.predict()
+    assert predicted[0, 0] > 130
+
+
+#IoU 가 기준보다 낮을 만큼 빨리 움직인 물체 : 이전 추적은 결과에서 빠지고 새 id 하나만 나와야 함
+def test_unmatched_track_is_not_returned_next_to_new_detection():
+    tracker = BoxTracker()
+    tracker.update(detection(100, 100, 200, 200))
+    out = tracker.update(detection(220, 100, 320, 200))
+    assert len(out) == 1
+    assert out[0, 4] == 2
+    for _ in range(2):
+        predicted = tracker.predict()
+        assert len(predicted) == 1
+        assert predicted[0, 4] == 2
+
+
+#검출에서 한번 빠진 추적은 결과에는 없지만, 다음 검출에서 다시 짝지어지면 같은 id 로 돌아옴
+def test_missed_track_is_hidden_and_can_be_recovered():
+    tracker = BoxTracker(max_missed=1)
+    tracker.update(detection(100, 100, 200, 200))
+    out = tracker.update(np.zeros((0, 6), dtype=np.float32))
+    assert len(out) == 0
+    assert len(tracker.predict()) == 0
+    out = tracker.update(detection(102, 100, 202, 200))
+    assert out[:, 4].tolist() == [1]
+
+
+def test_track_dropped_after_max_missed():
+    tracker = BoxTracker(max_missed=1)
+    tracker.update(detection(100, 100, 200, 200))
+    tracker.update(np.zeros((0, 6), dtype=np.float32))
+    tracker.update(np.zeros((0, 6), dtype=np.float32))
+    assert len(tracker) == 0
+
+
+def test_different_classes_are_not_matched():
+    tracker = BoxTracker()
+    tracker.update(detection(100, 100, 200, 200, cls=2))
+    out = tracker.update(detection(100, 100, 200, 200, cls=0))
+    assert out[:, 4].tolist() == [2]
+
+
+def test_scheduler_interval_and_scene_change():
+    scheduler = DetectionScheduler(interval=3, change_threshold=25.0)
+    frame = np.full((72, 128, 3), 80, dtype=np.uint8)
+    assert [scheduler.should_detect(frame) for _ in range(6)] == [True, False, False, True, False, False]
+    #장면이 크게 바뀌면 간격과 상관없이 바로 검출
+    assert scheduler.should_detect(np.full((72, 128, 3), 200, dtype=np.uint8))
@@ -0,0 +1,41 @@
+#RemapWarp 의 remap 캐시 파일 개수 제한 확인
+
+
+import os
+
+import numpy as np
+
+from geometry import RemapWarp
+
+
+def make_warp(cache_dir, shift, limit=2):
+    M = np.eye(3)
+    M[0, 2] = shift
+    return RemapWarp(M, np.linalg.inv(M), frame_size=(64, 32), cache_dir=cache_dir, cache_limit=limit)
+
+
+def test_cache_keeps_only_limit_files(tmp_path):
+    for shift in range(4):
+        make_warp(tmp_path, shift)
+    assert len(list(tmp_path.glob("remap_*.npz"))) == 2
+
+
+def test_cache_removes_least_recently_used(tmp_path):
+    first = make_warp(tmp_path, 0)
+    second = make_warp(tmp_path, 1)
+    first_file = tmp_path / f"remap_{first.cache_key()}.npz"
+    second_file = tmp_path / f"remap_{second.cache_key()}.npz"
+    #두 번째 파일을 더 오래된 것으로 만든 뒤 첫 번째를 다시 읽으면 첫 번째가 남아야 함
+    os.utime(first_file, (1, 1))
+    os.utime(second_file, (2, 2))
+    make_warp(tmp_path, 0)
+    make_warp(tmp_path, 2)
+    assert first_file.exists()
+    assert not second_file.exists()
+
+
+def test_cached_maps_match_built_maps(tmp_path):
+    built = make_warp(tmp_path, 3)
+    loaded = make_warp(tmp_path, 3)
+    frame = np.random.default_rng(0).integers(0, 256, (32, 64), dtype=np.uint8)
+    assert np.array_equal(built.warp(frame), loaded.warp(frame))
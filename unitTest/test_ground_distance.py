@@ -0,0 +1,58 @@
+#GroundDistanceModel 의 줄 단위 표가 점마다 원근 변환한 결과와 같은지, 왜곡이 있으면 점마다 변환하는지 확인
+
+
+import cv2 as cv
+import numpy as np
+
+from geometry import CameraCalibration, RemapWarp
+from ground_distance import GroundDistanceModel
+
+FRAME_SIZE = (160, 90)
+SRC = np.float32([[60, 50], [100, 50], [150, 85], [10, 85]])
+DST = np.float32([[40, 0], [120, 0], [120, 90], [40, 90]])
+
+
+def perspective():
+    return cv.getPerspectiveTransform(SRC, DST), cv.getPerspectiveTransform(DST, SRC)
+
+
+def anchors():
+    rng = np.random.default_rng(0)
+    return rng.uniform(0, FRAME_SIZE[0] - 1, 20), rng.uniform(50, FRAME_SIZE[1] - 1, 20)
+
+
+def test_row_table_matches_perspective_transform():
+    M, _ = perspective()
+    model = GroundDistanceModel(M, FRAME_SIZE)
+    x, y = anchors()
+    expected = cv.perspectiveTransform(np.stack([x, y], axis=-1).reshape(-1, 1, 2), M).reshape(-1, 2)
+    assert not model.per_point
+    assert np.allclose(model.project(x, y), expected, atol=0.05)
+
+
+def test_distortion_uses_per_point_transform():
+    M, Minv = perspective()
+    K = [[100, 0, 80], [0, 100, 45], [0, 0, 1]]
+    camera = CameraCalibration(K, [-0.3, 0.1, 0, 0, 0], FRAME_SIZE)
+    warp = RemapWarp(M, Minv, camera, frame_size=FRAME_SIZE, cache_dir=None)
+    model = GroundDistanceModel(warp, FRAME_SIZE)
+    x, y = anchors()
+    expected = warp.project_points(np.stack([x, y], axis=-1).astype(np.float32).reshape(-1, 1, 2)).reshape(-1, 2)
+    assert model.per_point
+    assert np.allclose(model.project(x, y), expected, atol=1e-3)
+
+
+def test_ground_distance_is_closer_lower_in_image():
+    M, _ = perspective()
+    model = GroundDistanceModel(M, FRAME_SIZE, far_cm=1200, min_cm=50)
+    warped_y = model.project(np.full(3, 80.0), np.array([55.0, 70.0, 89.0]))[:, 1]
+    ground = model.ground_distance(warped_y)
+    assert ground[0] > ground[1] > ground[2] >= 50
+
+
+def test_distance_mixes_height_and_ground():
+    M, _ = perspective()
+    model = GroundDistanceModel(M, FRAME_SIZE, far_cm=1200, focal_length=400, height_weight=0.7)
+    warped_y = np.array([45.0])
+    distance = model.distance(warped_y, np.array([100.0]), np.array([150.0]))
+    assert np.allclose(distance, 150 * 400 / 100 * 0.7 + 1200 * 0.5 * 0.3)
@@ -0,0 +1,47 @@
+#LaneZoneMask 가 차선 다항식으로 내 차선 / 옆 차선 / 바깥 / 판단 불가를 나누는지 확인
+
+
+import numpy as np
+
+from lane_zones import LaneZoneMask, ZONE_ADJACENT, ZONE_EGO, ZONE_OUTSIDE, ZONE_UNKNOWN
+
+FRAME_SIZE = (160, 96)
+#원근 변환 이미지 전체를 원본 아래쪽 절반(y 48 ~ 96)으로 되돌리는 역 원근변환 (x 는 그대로)
+MINV = np.array([[1, 0, 0], [0, 0.5, 48], [0, 0, 1]], dtype=np.float64)
+
+
+#x = 60, x = 100 에 있는 곧은 좌우 차선 (차선 폭 40)
+def straight_lane():
+    return {
+        "left_fit": np.array([0.0, 0.0, 60.0]),
+        "right_fit": np.array([0.0, 0.0, 100.0]),
+        "warped_shape": (FRAME_SIZE[1], FRAME_SIZE[0]),
+    }
+
+
+def test_classify_zones_across_the_road():
+    zones = LaneZoneMask(FRAME_SIZE, cell=4).update(straight_lane(), MINV)
+    x = np.array([80, 40, 120, 4, 156])
+    y = np.full(len(x), 80)
+    assert list(zones.classify(x, y)) == [ZONE_EGO, ZONE_ADJACENT, ZONE_ADJACENT, ZONE_OUTSIDE, ZONE_OUTSIDE]
+
+
+def test_above_tracked_lane_is_unknown():
+    zones = LaneZoneMask(FRAME_SIZE, cell=4).update(straight_lane(), MINV)
+    assert list(zones.classify(np.array([80, 40]), np.array([20, 20]))) == [ZONE_UNKNOWN, ZONE_UNKNOWN]
+
+
+def test_missing_lane_marks_everything_unknown():
+    zones = LaneZoneMask(FRAME_SIZE, cell=4).update(straight_lane(), MINV)
+    lane = straight_lane()
+    lane["right_fit"] = None
+    zones.update(lane, MINV)
+    assert not zones.valid
+    assert list(zones.classify(np.array([80, 40]), np.array([80, 80]))) == [ZONE_UNKNOWN, ZONE_UNKNOWN]
+    zones.update(None, MINV)
+    assert not zones.valid
+
+
+def test_points_outside_frame_are_clipped():
+    zones = LaneZoneMask(FRAME_SIZE, cell=4).update(straight_lane(), MINV)
+    assert list(zones.classify(np.array([80, -50]), np.array([500, 80]))) == [ZONE_EGO, ZONE_OUTSIDE]
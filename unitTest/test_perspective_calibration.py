@@ -0,0 +1,86 @@
+#원근 변환 자동 보정 : 기본 사다리꼴, 캐시 저장/읽기, 영상 키, 합성 차선으로 소실점 추정 확인
+
+
+import json
+
+import cv2 as cv
+import numpy as np
+
+import perspective_calibration
+from perspective_calibration import PerspectiveCalibrator
+
+WIDTH, HEIGHT = 640, 360
+VANISHING_POINT = (330, 170)
+LEFT_BASE, RIGHT_BASE = 120, 540
+
+
+#소실점으로 모이는 두 차선을 그린 합성 도로 이미지
+def road_frame():
+    frame = np.full((HEIGHT, WIDTH, 3), 60, dtype=np.uint8)
+    for base in (LEFT_BASE, RIGHT_BASE):
+        cv.line(frame, (base, HEIGHT - 1), VANISHING_POINT, (255, 255, 255), 6)
+    #보정은 프레임 아래쪽만 보므로 지평선 위는 하늘처럼 칠함
+    frame[:VANISHING_POINT[1] + 5] = 200
+    return frame
+
+
+def test_default_perspective_maps_src_to_dst():
+    perspective = perspective_calibration.default_perspective(WIDTH, HEIGHT)
+    warped = cv.perspectiveTransform(perspective["src"][:, None], perspective["M"])[:, 0]
+    assert np.allclose(warped, perspective["dst"], atol=1e-3)
+    product = perspective["M"] @ perspective["Minv"]
+    assert np.allclose(product / product[2, 2], np.eye(3), atol=1e-3)
+
+
+def test_fingerprint_depends_on_file_and_resolution(tmp_path):
+    video = tmp_path / "a.avi"
+    video.write_bytes(b"1234")
+    key = perspective_calibration.source_fingerprint(video, WIDTH, HEIGHT)
+    assert key == perspective_calibration.source_fingerprint(str(video), WIDTH, HEIGHT)
+    assert key != perspective_calibration.source_fingerprint(video, WIDTH * 2, HEIGHT * 2)
+    video.write_bytes(b"12345")
+    assert key != perspective_calibration.source_fingerprint(video, WIDTH, HEIGHT)
+    assert (perspective_calibration.source_fingerprint(0, WIDTH, HEIGHT) ==
+            perspective_calibration.source_fingerprint("0", WIDTH, HEIGHT))
+
+
+def test_cache_round_trip(tmp_path):
+    cache_path = tmp_path / "cache" / "perspective.json"
+    perspective, cached = perspective_calibration.load_or_default("a", WIDTH, HEIGHT, cache_path)
+    assert not cached
+    perspective_calibration.save_cached("a", perspective, cache_path)
+    perspective_calibration.save_cached("b", perspective, cache_path)
+    loaded, cached = perspective_calibration.load_or_default("a", WIDTH, HEIGHT, cache_path)
+    assert cached
+    for name in ("src", "dst", "M", "Minv"):
+        assert np.allclose(loaded[name], perspective[name])
+    assert loaded["vanishing_point"] == tuple(perspective["vanishing_point"])
+    assert set(json.loads(cache_path.read_text(encoding="utf-8"))) == {"a", "b"}
+
+
+def test_corrupt_cache_falls_back_to_default(tmp_path):
+    cache_path = tmp_path / "perspective.json"
+    cache_path.write_text("{not json", encoding="utf-8")
+    assert perspective_calibration.load_cached("a", cache_path) is None
+    _, cached = perspective_calibration.load_or_default("a", WIDTH, HEIGHT, cache_path)
+    assert not cached
+
+
+def test_calibrator_finds_vanishing_point_and_lane_base():
+    calibrator = PerspectiveCalibrator(WIDTH, HEIGHT, max_frames=5, min_segments=1)
+    frame = road_frame()
+    while not calibrator.feed(frame):
+        pass
+    result = calibrator.result
+    assert result is not None
+    assert np.allclose(result["vanishing_point"], VANISHING_POINT, atol=6)
+    assert np.allclose(result["src"][2:, 0], [RIGHT_BASE, LEFT_BASE], atol=6)
+    assert np.allclose(result["src"][2:, 1], HEIGHT)
+
+
+def test_calibrator_gives_up_without_lanes():
+    calibrator = PerspectiveCalibrator(WIDTH, HEIGHT, max_frames=3, min_segments=1)
+    frame = np.full((HEIGHT, WIDTH, 3), 60, dtype=np.uint8)
+    results = [calibrator.feed(frame) for _ in range(3)]
+    assert results == [False, False, True]
+    assert calibrator.result is None
@@ -0,0 +1,100 @@
+#VideoPipeline.process_detections 의 배열 연산(필터, 좌표 변환, 거리 계산)이 박스마다 계산한 결과와 같은지 확인
+
+
+import cv2
+import numpy as np
+
+import perspective_calibration
+from compositor import AnnotationCompositor
+from ground_distance import GroundDistanceModel
+from lane_zones import LaneZoneMask
+from pipeline import (CONF_THRESHOLD, DIST_THRESHOLD, FOCAL_LENGTH, KNOWN_HEIGHTS, RESIZE_HEIGHT, RESIZE_WIDTH,
+                      VideoPipeline)
+
+FRAME_SHAPE = (RESIZE_HEIGHT, RESIZE_WIDTH, 3)
+
+
+#경고로 보낸 값 기록
+class SentWarnings:
+    def __init__(self):
+        self.sent = []
+
+    def set_data(self, class_id, distance_cm, frame_height):
+        self.sent.append((class_id, distance_cm))
+
+
+def setup():
+    M = perspective_calibration.default_perspective(RESIZE_WIDTH, RESIZE_HEIGHT)["M"]
+    model = GroundDistanceModel(M, (RESIZE_WIDTH, RESIZE_HEIGHT), far_cm=DIST_THRESHOLD, focal_length=FOCAL_LENGTH)
+    pipeline = VideoPipeline("line_check", "unused.avi", None)
+    pipeline.socket_client = SentWarnings()
+    #차선 정보 없음 : 모든 물체가 ZONE_UNKNOWN 이라 거리 계산과 경고 대상
+    zones = LaneZoneMask((RESIZE_WIDTH, RESIZE_HEIGHT))
+    return M, model, pipeline, zones
+
+
+#기존 방식대로 박스 하나씩 perspectiveTransform 으로 구한 거리
+def reference_distance(M, box):
+    x1, y1, x2, y2, conf, cls = box
+    height = y2 - y1
+    anchor = np.float32([[[(x1 + x2) / 2, y2 - 0.2 * height]]])
+    warped_y = cv2.perspectiveTransform(anchor, M)[0, 0, 1]
+    ground = max(50, DIST_THRESHOLD * (1 - warped_y / RESIZE_HEIGHT))
+    return KNOWN_HEIGHTS[int(cls)] * FOCAL_LENGTH / height * 0.7 + ground * 0.3
+
+
+def labels(compositor):
+    return [args[0] for kind, args in compositor.commands if kind == "label"]
+
+
+def test_distances_match_per_box_reference():
+    M, model, pipeline, zones = setup()
+    boxes = np.array([[500, 400, 700, 700, 0.9, 2],
+                      [600, 380, 640, 410, 0.8, 2],
+                      [300, 300, 420, 600, 0.7, 0],
+                      [800, 350, 900, 450, 0.6, 7]], dtype=np.float32)
+    compositor = AnnotationCompositor()
+    pipeline.process_detections(boxes, model, zones, FRAME_SHAPE, compositor)
+    expected = [f"{reference_distance(M, box) / 100:.1f}m" for box in boxes]
+    assert labels(compositor) == expected
+
+
+def test_filters_class_confidence_and_height():
+    _, model, pipeline, zones = setup()
+    boxes = np.array([[500, 400, 700, 700, 0.9, 2],
+                      [500, 400, 700, 700, CONF_THRESHOLD - 0.05, 2],
+                      [500, 400, 700, 700, 0.9, 9],
+                      [500, 400, 700, 415, 0.9, 2]], dtype=np.float32)
+    compositor = AnnotationCompositor()
+    pipeline.process_detections(boxes, model, zones, FRAME_SHAPE, compositor)
+    assert len(labels(compositor)) == 1
+    assert [kind for kind, _ in compositor.commands].count("box") == 1
+
+
+def test_close_object_warns_and_far_object_does_not():
+    _, model, pipeline, zones = setup()
+    compositor = AnnotationCompositor()
+    far = np.array([[600, 380, 625, 405, 0.8, 2]], dtype=np.float32)
+    assert not pipeline.process_detections(far, model, zones, FRAME_SHAPE, compositor)
+    assert pipeline.socket_client.sent == []
+    near = np.array([[500, 400, 700, 700, 0.9, 2]], dtype=np.float32)
+    assert pipeline.process_detections(near, model, zones, FRAME_SHAPE, compositor)
+    assert [class_id for class_id, _ in pipeline.socket_client.sent] == [2]
+    assert pipeline.socket_client.sent[0][1] < DIST_THRESHOLD
+
+
+def test_accepts_tracker_rows():
+    _, model, pipeline, zones = setup()
+    detections = np.array([[500, 400, 700, 700, 0.9, 2]], dtype=np.float32)
+    tracked = np.array([[500, 400, 700, 700, 7, 0.9, 2]], dtype=np.float32)
+    from_detector, from_tracker = AnnotationCompositor(), AnnotationCompositor()
+    pipeline.process_detections(detections, model, zones, FRAME_SHAPE, from_detector)
+    pipeline.process_detections(tracked, model, zones, FRAME_SHAPE, from_tracker)
+    assert labels(from_detector) == labels(from_tracker)
+
+
+def test_empty_detections():
+    _, model, pipeline, zones = setup()
+    compositor = AnnotationCompositor()
+    assert not pipeline.process_detections(np.zeros((0, 6), np.float32), model, zones, FRAME_SHAPE, compositor)
+    assert len(compositor) == 0
@@ -0,0 +1,49 @@
+#Sprite.draw 가 float alpha 합성(기존 overlay_warning_banner 방식)과 같은 결과를 내는지 확인
+
+
+import numpy as np
+
+from sprites import Sprite
+
+
+#frame * (1 - a) + color * a 를 float 으로 계산한 기준 결과
+def reference_blend(frame, image, x, y):
+    out = frame.astype(np.float64)
+    h, w = image.shape[:2]
+    fh, fw = frame.shape[:2]
+    fx0, fy0, fx1, fy1 = max(x, 0), max(y, 0), min(fw, x + w), min(fh, y + h)
+    crop = image[fy0 - y:fy1 - y, fx0 - x:fx1 - x].astype(np.float64)
+    alpha = crop[:, :, 3:] / 255.0
+    out[fy0:fy1, fx0:fx1] = out[fy0:fy1, fx0:fx1] * (1 - alpha) + crop[:, :, :3] * alpha
+    return out
+
+
+def random_rgba(rng, h, w):
+    image = rng.integers(0, 256, (h, w, 4), dtype=np.uint8)
+    #투명한 테두리, 완전 불투명 / 완전 투명 영역도 포함
+    image[:3, :, 3] = 0
+    image[-5:, :, 3] = 255
+    image[:, :4, 3] = 0
+    return image
+
+
+def test_draw_matches_float_blend():
+    rng = np.random.default_rng(0)
+    image = random_rgba(rng, 40, 60)
+    sprite = Sprite(image)
+    for x, y in [(10, 20), (-15, -8), (90, 50)]:
+        frame = rng.integers(0, 256, (80, 120, 3), dtype=np.uint8)
+        expected = reference_blend(frame, image, x, y)
+        sprite.draw(frame, x, y)
+        assert np.abs(frame.astype(np.float64) - expected).max() <= 2
+
+
+#255 - alpha 가 B, G, R 세 채널 모두에 같게 들어가야 함
+def test_inverse_alpha_covers_all_channels():
+    rng = np.random.default_rng(1)
+    image = random_rgba(rng, 20, 20)
+    image[:, 10, 3] = 0
+    sprite = Sprite(image)
+    alpha = image[3:, 4:, 3]
+    for c in range(3):
+        assert np.array_equal(sprite.inv_alpha[:, :, c], 255 - alpha)
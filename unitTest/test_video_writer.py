@@ -0,0 +1,92 @@
+#AsyncVideoWriter 의 큐 정책(block / drop), 확장자 바꾸기, 열기 실패 처리 확인
+
+
+import threading
+
+import cv2
+import numpy as np
+import pytest
+
+from video_writer import AsyncVideoWriter
+
+SIZE = (64, 48)
+
+
+def frames(count):
+    return [np.full((SIZE[1], SIZE[0], 3), i * 20, dtype=np.uint8) for i in range(count)]
+
+
+def frame_count(path):
+    cap = cv2.VideoCapture(str(path))
+    count = 0
+    while cap.read()[0]:
+        count += 1
+    cap.release()
+    return count
+
+
+#저장 스레드가 풀어줄 때까지 write 에서 멈추게 하는 writer (큐가 가득 찬 상태를 만들기 위해)
+class GatedWriter:
+    def __init__(self, writer):
+        self.writer = writer
+        self.entered = threading.Event()
+        self.gate = threading.Event()
+
+    def write(self, frame):
+        self.entered.set()
+        self.gate.wait()
+        self.writer.write(frame)
+
+    def __getattr__(self, name):
+        return getattr(self.writer, name)
+
+
+def test_block_writes_every_frame(tmp_path):
+    path = tmp_path / "out.avi"
+    writer = AsyncVideoWriter(path, SIZE, codec="MJPG", queue_size=2, policy="block")
+    for frame in frames(10):
+        assert writer.write(frame)
+    writer.close()
+    assert writer.stats() == {"queued": 10, "written": 10, "dropped": 0, "pending": 0}
+    assert frame_count(path) == 10
+
+
+def test_drop_discards_frames_when_queue_is_full(tmp_path):
+    writer = AsyncVideoWriter(tmp_path / "out.avi", SIZE, codec="MJPG", queue_size=2, policy="drop")
+    gated = writer.writer = GatedWriter(writer.writer)
+    batch = frames(5)
+    #첫 프레임은 저장 스레드가 꺼내서 멈춰 있고, 다음 2개는 큐에, 나머지 2개는 버려짐
+    assert writer.write(batch[0])
+    assert gated.entered.wait(5)
+    assert [writer.write(frame) for frame in batch[1:]] == [True, True, False, False]
+    gated.gate.set()
+    writer.close()
+    assert writer.stats() == {"queued": 3, "written": 3, "dropped": 2, "pending": 0}
+
+
+def test_write_after_close_is_ignored(tmp_path):
+    writer = AsyncVideoWriter(tmp_path / "out.avi", SIZE, codec="MJPG")
+    writer.close()
+    assert not writer.write(frames(1)[0])
+    assert writer.stats()["queued"] == 0
+
+
+def test_unsupported_extension_falls_back_to_codec_extension(tmp_path):
+    #압축 없는 raw 는 mp4 컨테이너에 못 넣으므로 .avi 로 바뀜
+    writer = AsyncVideoWriter(tmp_path / "out.mp4", SIZE, codec="raw")
+    writer.write(frames(1)[0])
+    writer.close()
+    assert writer.path == str(tmp_path / "out.avi")
+    assert frame_count(writer.path) == 1
+
+
+def test_open_failure_raises(tmp_path):
+    with pytest.raises(RuntimeError):
+        AsyncVideoWriter(tmp_path / "missing" / "out.avi", SIZE, codec="MJPG")
+
+
+def test_unknown_codec_and_policy_are_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        AsyncVideoWriter(tmp_path / "out.avi", SIZE, codec="H265")
+    with pytest.raises(ValueError):
+        AsyncVideoWriter(tmp_path / "out.avi", SIZE, policy="skip")
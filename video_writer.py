@@ -0,0 +1,115 @@
+#결과 영상 저장을 전용 스레드에서 하는 모듈
+#처리 스레드는 큐에 넣기만 하고 인코딩(1280x720 프레임당 수 ms)은 저장 스레드에서 진행
+#큐가 가득 찼을 때의 동작(기다리기 / 버리기 / 화질 낮추기)을 고를 수 있음
+
+
+import queue
+import threading
+from pathlib import Path
+
+import cv2
+
+#코덱 이름 -> fourcc, 권장 확장자
+#MJPG : 인코딩이 가장 빠름 (파일은 큼), raw : 압축 없음 (CPU 거의 안 씀, 파일 매우 큼)
+CODECS = {
+    "XVID": ("XVID", ".avi"),
+    "mp4v": ("mp4v", ".mp4"),
+    "MJPG": ("MJPG", ".avi"),
+    "raw": (None, ".avi"),
+}
+
+#큐가 가득 찼을 때 : block 은 자리가 날 때까지 기다림, drop 은 이번 프레임을 버림
+#reduce 는 큐가 차오르면 인코딩 화질을 낮춰서(MJPG 만 지원) 저장 속도를 올리고, 그래도 가득 차면 기다림
+POLICIES = ("block", "drop", "reduce")
+
+
+#path : 저장 경로 (코덱과 맞지 않는 확장자라 열리지 않으면 권장 확장자로 바꿔서 저장), size : (w, h)
+#fps : 저장 fps, codec : CODECS 의 이름
+#queue_size : 저장 대기 최대 프레임 수, policy : POLICIES 중 하나
+#quality : 기본 화질, reduced_quality : reduce 일 때 낮춘 화질 (0~100, MJPG)
+class AsyncVideoWriter:
+    def __init__(self, path, size, fps=30, codec="XVID", queue_size=32, policy="block",
+                 quality=95, reduced_quality=50):
+        if codec not in CODECS:
+            raise ValueError(f"Unknown codec: {codec}")
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown writer policy: {policy}")
+        fourcc_name, extension = CODECS[codec]
+        fourcc = cv2.VideoWriter_fourcc(*fourcc_name) if fourcc_name is not None else 0
+        self.path = str(path)
+        self.writer = cv2.VideoWriter(self.path, fourcc, fps, tuple(size))
+        if not self.writer.isOpened() and Path(self.path).suffix.lower() != extension:
+            fixed = str(Path(self.path).with_suffix(extension))
+            print(f"[AsyncVideoWriter] codec {codec} cannot write {self.path}, writing {fixed} instead")
+            self.path = fixed
+            self.writer = cv2.VideoWriter(self.path, fourcc, fps, tuple(size))
+        if not self.writer.isOpened():
+            raise RuntimeError(f"Cannot open video writer: {self.path} (codec {codec})")
+        self.policy = policy
+        self.quality = quality
+        self.reduced_quality = reduced_quality
+        self.reduced = False
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.queued = 0
+        self.written = 0
+        self.dropped = 0
+        self.closed = False
+        if policy == "reduce" and not self.writer.set(cv2.VIDEOWRITER_PROP_QUALITY, quality):
+            print(f"[AsyncVideoWriter] codec {codec} has no quality setting, reduce works like block")
+        self.thread = threading.Thread(target=self.consume, name="video-writer", daemon=True)
+        self.thread.start()
+
+    @property
+    def opened(self):
+        return self.writer.isOpened()
+
+    #frame 은 저장이 끝날 때까지 그대로 쓰이므로 호출한 쪽에서 다시 고쳐 쓰면 안됨
+    #반환 : 큐에 넣었으면 True, 버렸으면 False
+    def write(self, frame):
+        if self.closed:
+            return False
+        if self.policy == "drop":
+            try:
+                self.queue.put_nowait(frame)
+            except queue.Full:
+                self.dropped += 1
+                return False
+        else:
+            self.queue.put(frame)
+        self.queued += 1
+        return True
+
+    def consume(self):
+        while True:
+            frame = self.queue.get()
+            if frame is None:
+                break
+            if self.policy == "reduce":
+                self.adjust_quality()
+            self.writer.write(frame)
+            self.written += 1
+
+    #큐가 3/4 이상 차면 화질을 낮추고, 1/4 아래로 비면 원래대로
+    def adjust_quality(self):
+        fill = self.queue.qsize() / self.queue.maxsize
+        if not self.reduced and fill >= 0.75:
+            self.reduced = self.writer.set(cv2.VIDEOWRITER_PROP_QUALITY, self.reduced_quality)
+        elif self.reduced and fill <= 0.25:
+            self.writer.set(cv2.VIDEOWRITER_PROP_QUALITY, self.quality)
+            self.reduced = False
+
+    def stats(self):
+        return {"queued": self.queued, "written": self.written, "dropped": self.dropped,
+                "pending": self.queue.qsize()}
+
+    #남은 프레임을 모두 저장하고 파일을 닫음
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self.queue.put(None)
+        self.thread.join()
+        self.writer.release()
+        stats = self.stats()
+        print(f"[AsyncVideoWriter] {self.path}: queued={stats['queued']} "
+              f"written={stats['written']} dropped={stats['dropped']}")